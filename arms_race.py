@@ -8,54 +8,103 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, NamedTuple
+
+import math
+import random
+import weakref
 
 import babase
 import bascenev1 as bs
 
 if TYPE_CHECKING:
-    from typing import Any, Type, List, Union, Sequence
-
-
-class State:
-    def __init__(self, bomb=None, grab=False, punch=False, curse=False, required=False, final=False, name=''):
-        self.bomb = bomb
-        self.grab = grab
-        self.punch = punch
-        self.pickup = False
-        self.curse = curse
-        self.required = required or final
-        self.final = final
-        self.name = name
-        self.next = None
-        self.index = None
+    from typing import Any, Callable, Type, List, Union, Sequence
+
+# Log how long our callbacks take at the end of every game. Needs perf_hooks.py.
+PROFILE_CALLBACKS = False
+# Warn about callbacks slower than this many milliseconds, 0 to turn off. Needs perf_hooks.py.
+WATCHDOG_BUDGET_MS = 0.0
+
+
+class State(NamedTuple):
+    bomb: str | None = None
+    grab: bool = False
+    punch: bool = False
+    curse: bool = False
+    required: bool = False
+    final: bool = False
+    name: str = ''
+    # Where this state sits in a progression, and the state a kill moves you to. Set by get_progression().
+    index: int = 0
+    next_index: int | None = None
 
     def apply(self, spaz):
-        spaz.disconnect_controls_from_player()
-        spaz.connect_controls_to_player(enable_punch=self.punch,
-                                        enable_bomb=self.bomb,
-                                        enable_pickup=self.grab)
-        if self.curse:
+        # Only touch what's different from the state the spaz is in already.
+        # Reconnecting controls in particular isn't cheap, and we do this on every kill.
+        previous = getattr(spaz, 'arms_race_state', None)
+        if previous is self:
+            return
+        if previous is None or previous.controls() != self.controls():
+            # Disconnecting first also releases anything being held, like pickup when grabbing goes away.
+            spaz.disconnect_controls_from_player()
+            spaz.connect_controls_to_player(enable_punch=self.punch,
+                                            enable_bomb=self.bomb,
+                                            enable_pickup=self.grab)
+        if self.curse and not (previous and previous.curse):
             try:
                 spaz.curse_time = -1
                 spaz.curse()
             except:
                 pass
-        if self.bomb:
+        if self.bomb and (previous is None or previous.bomb != self.bomb):
             spaz.bomb_type = self.bomb
-        spaz.set_score_text(self.name)
+        if previous is None or previous.name != self.name:
+            spaz.set_score_text(self.name)
+        spaz.arms_race_state = self
+
+    def controls(self):
+        return (self.punch, bool(self.bomb), self.grab)
 
     def get_setting(self):
         return (self.name)
 
 
-states = [State(bomb='normal', name='Basic Bombs'),
-          State(bomb='ice', name='Frozen Bombs'),
-          State(bomb='sticky', name='Sticky Bombs'),
-          State(bomb='impact', name='Impact Bombs'),
-          State(grab=True, name='Grabbing only'),
-          State(punch=True, name='Punching only'),
-          State(curse=True, name='Cursed', final=True)]
+_states = None
+# Compiled progressions, keyed by the names of the states in them.
+# Every activity with the same settings shares one, so they must never be changed.
+_progressions: dict[tuple[str, ...], tuple[State, ...]] = {}
+
+
+# Built on first use instead of at import, which happens for every plugin when the game boots.
+def get_states():
+    global _states
+    if _states is None:
+        _states = (State(bomb='normal', name='Basic Bombs'),
+                   State(bomb='ice', name='Frozen Bombs'),
+                   State(bomb='sticky', name='Sticky Bombs'),
+                   State(bomb='impact', name='Impact Bombs'),
+                   State(grab=True, name='Grabbing only'),
+                   State(punch=True, name='Punching only'),
+                   State(curse=True, name='Cursed', required=True, final=True))
+    return _states
+
+
+def get_progression(settings: dict) -> tuple[State, ...]:
+    """The states enabled in settings, in order, with their index and next_index filled in."""
+    key = tuple(state.name for state in get_states() if settings.get(state.name, True))
+    progression = _progressions.get(key)
+    if progression is None:
+        enabled = [state for state in get_states() if state.name in key]
+        progression = _progressions[key] = tuple(
+            state._replace(index=i, next_index=None if state.final else i + 1)
+            for i, state in enumerate(enabled))
+    return progression
+
+
+def __getattr__(name):
+    if name == 'states':
+        return get_states()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 
 class Player(bs.Player['Team']):
@@ -110,7 +159,7 @@ class ArmsRaceGame(bs.TeamGameActivity[Player, Team]):
                 default=1.0,
             ),
             bs.BoolSetting('Epic Mode', default=False)]
-        for state in states:
+        for state in get_states():
             if not state.required:
                 settings.append(bs.BoolSetting(state.get_setting(), default=True))
 
@@ -127,20 +176,26 @@ class ArmsRaceGame(bs.TeamGameActivity[Player, Team]):
 
     def __init__(self, settings: dict):
         super().__init__(settings)
-        self.states = [s for s in states if settings.get(s.name, True)]
-        for i, state in enumerate(self.states):
-            if i < len(self.states) and not state.final:
-                state.next = self.states[i + 1]
-            state.index = i
+        self.states = get_progression(settings)
+        # (victim, killer) for deaths we haven't gotten to yet. killer is None if nobody gets credit.
+        self._deaths: list[tuple[Player, Player | None]] = []
         self._dingsound = bs.getsound('dingSmall')
         self._epic_mode = bool(settings['Epic Mode'])
         self._time_limit = float(settings['Time Limit'])
+        self.respawn_waves = RespawnWaves(self, self.spawn_player,
+                                          ffa=not isinstance(self.session, bs.DualTeamSession))
+        if WATCHDOG_BUDGET_MS:
+            import perf_hooks
+            perf_hooks.watch(self, WATCHDOG_BUDGET_MS, self.describe_state)
 
         # Base class overrides.
         self.slow_motion = self._epic_mode
         self.default_music = (bs.MusicType.EPIC if self._epic_mode else
                               bs.MusicType.TO_THE_DEATH)
 
+    def describe_state(self) -> dict:
+        return {'players': len(self.players), 'nodes': len(bs.getnodes())}
+
     def get_instance_description(self) -> Union[str, Sequence]:
         return 'Upgrade your weapon by eliminating enemies.'
 
@@ -158,40 +213,171 @@ class ArmsRaceGame(bs.TeamGameActivity[Player, Team]):
         self.spawn_player(player)
 
     # overriding the default character spawning..
-    def spawn_player(self, player):
+    def spawn_player(self, player, position=None):
         if player.state is None:
             player.state = self.states[0]
-        super().spawn_player(player)
+        if position is None:
+            super().spawn_player(player)
+        else:
+            self.spawn_player_spaz(player, position)
         player.state.apply(player.actor)
 
-    def isValidKill(self, m):
-        if m.getkillerplayer(Player) is None:
-            return False
-
-        if m.getkillerplayer(Player).team is m.getplayer(Player).team:
-            return False
-
-        return True
+    # Same respawn times as usual, but players who are due around the same time come back together.
+    def respawn_player(self, player, respawn_time=None):
+        if respawn_time is None:
+            respawn_time = get_respawn_time(self, player)
+        if player.actor and not self.has_ended():
+            from bascenev1lib.actor.respawnicon import RespawnIcon
+            self.respawn_waves.schedule(player, respawn_time)
+            player.customdata['respawn_icon'] = RespawnIcon(player, respawn_time)
 
     def handlemessage(self, msg: Any) -> Any:
 
         if isinstance(msg, bs.PlayerDiedMessage):
-            if self.isValidKill(msg):
-                self.stats.player_scored(msg.getkillerplayer(Player), 10, kill=True)
-                if not msg.getkillerplayer(Player).state.final:
-                    msg.getkillerplayer(Player).state = msg.getkillerplayer(Player).state.next
-                    msg.getkillerplayer(Player).state.apply(msg.getkillerplayer(Player).actor)
-                else:
-                    msg.getkillerplayer(Player).team.score += 1
-                    self.end_game()
-            self.respawn_player(msg.getplayer(Player))
+            victim = msg.getplayer(Player)
+            killer = msg.getkillerplayer(Player)
+            # Team kills and suicides don't count.
+            if killer is not None and killer.team is victim.team:
+                killer = None
+            # One bomb can kill a bunch of players at once, so we handle everyone who died this step together.
+            if not self._deaths:
+                bs.timer(0, bs.WeakCall(self._resolve_deaths))
+            self._deaths.append((victim, killer))
 
         else:
             return super().handlemessage(msg)
         return None
 
+    def _resolve_deaths(self) -> None:
+        deaths, self._deaths = self._deaths, []
+        if self.has_ended():
+            return
+
+        for victim, killer in deaths:
+            if killer is not None and killer.exists():
+                self.stats.player_scored(killer, 10, kill=True)
+
+        # Move killers up the ladder one kill at a time, but give each of them their new weapon only once.
+        promoted = {}
+        for victim, killer in deaths:
+            if killer is None or not killer.exists():
+                continue
+            if killer.state.final:
+                killer.team.score += 1
+                self.end_game()
+                return
+            killer.state = self.states[killer.state.next_index]
+            promoted[killer] = None
+        for killer in promoted:
+            # Dead killers get their new state when they respawn.
+            if killer.is_alive():
+                killer.state.apply(killer.actor)
+
+        for victim, killer in deaths:
+            if victim.exists():
+                self.respawn_player(victim)
+
     def end_game(self) -> None:
         results = bs.GameResults()
         for team in self.teams:
             results.set_team_score(team, team.score)
         self.end(results=results)
+
+
+# Respawns due within the same window go off together, with spawn points picked once for the whole wave.
+# Waves go off on multiples of the window, so nobody comes back early or more than one window late.
+RESPAWN_WAVE_WINDOW = 0.25
+
+
+class RespawnWave:
+    __slots__ = ('time', 'players')
+
+    def __init__(self, time: float) -> None:
+        self.time = time
+        self.players: list[Player] = []
+
+
+class RespawnWaves:
+    """Spawns players in waves, using spawn(player, position) for each of them.
+
+    With ffa=False no spawn points are picked and position is None, for teams that have their own.
+    """
+
+    def __init__(self, activity: bs.Activity,
+                 spawn: Callable[[Any, Sequence[float] | None], Any],
+                 window: float = RESPAWN_WAVE_WINDOW, ffa: bool = True) -> None:
+        # Weak, so the activity isn't kept alive in a cycle with us.
+        self._activity = weakref.ref(activity)
+        self._spawn = weakref.WeakMethod(spawn)
+        self.window = window
+        self.ffa = ffa
+        # Waiting waves, keyed by the window they go off at the end of.
+        self._waves: dict[int, RespawnWave] = {}
+
+    def schedule(self, player: Player, delay: float = 0.0) -> None:
+        now = bs.time()
+        # The nudge keeps float noise from pushing a due time right on a boundary into the next window.
+        index = math.ceil((now + delay) / self.window - 1e-6)
+        wave = self._waves.get(index)
+        if wave is None:
+            wave = self._waves[index] = RespawnWave(index * self.window)
+            bs.timer(max(0.0, wave.time - now), bs.WeakCall(self._release, index))
+        if player not in wave.players:
+            wave.players.append(player)
+
+    def pending(self, player: Player) -> bool:
+        return any(player in wave.players for wave in self._waves.values())
+
+    def _release(self, index: int) -> None:
+        wave = self._waves.pop(index)
+        activity = self._activity()
+        spawn = self._spawn()
+        players = [player for player in wave.players if player.exists()]
+        if not players or activity is None or spawn is None or activity.has_ended():
+            return
+        if self.ffa:
+            positions: list[Sequence[float] | None] = list(pick_spawn_positions(activity, len(players)))
+        else:
+            positions = [None] * len(players)
+        for player, position in zip(players, positions):
+            spawn(player, position)
+
+
+# Does for a whole wave what map.get_ffa_start_position() does for one player.
+def pick_spawn_positions(activity: bs.Activity, count: int) -> list[tuple[float, float, float]]:
+    points = activity.map.ffa_spawn_points
+    taken = [player.node.position for player in activity.players if player.is_alive()]
+    if taken:
+        # Emptiest spawn points first, measured once so a big wave gets spread over all of them.
+        points = sorted(points, reverse=True, key=lambda point: min(
+            (point[0] - other[0]) ** 2 + (point[2] - other[2]) ** 2 for other in taken))
+    else:
+        points = random.sample(points, len(points))
+    positions = []
+    for i in range(count):
+        point = points[i % len(points)]
+        x_range = point[3] if point[3] else 0.5
+        z_range = point[5] if point[5] else 0.5
+        positions.append((point[0] + random.uniform(-x_range, x_range),
+                          point[1],
+                          point[2] + random.uniform(-z_range, z_range)))
+    return positions
+
+
+# Same as GameActivity.respawn_player() works out.
+def get_respawn_time(activity: bs.GameActivity, player: Player) -> float:
+    seconds = {1: 3.0, 2: 5.0, 3: 6.0}.get(len(player.team.players), 7.0)
+    if 'Respawn Times' in activity.settings_raw:
+        seconds *= activity.settings_raw['Respawn Times']
+    return round(max(1.0, seconds), 0)
+
+
+def profile_callbacks(dump=True):
+    import perf_hooks
+    perf_hooks.instrument(ArmsRaceGame, ('handlemessage', '_resolve_deaths', 'spawn_player'),
+                          dump_after='end_game' if dump else None)
+    perf_hooks.instrument(RespawnWaves, ('_release',))
+
+
+if PROFILE_CALLBACKS or WATCHDOG_BUDGET_MS:
+    profile_callbacks(dump=PROFILE_CALLBACKS)
@@ -0,0 +1,187 @@
+"""Microbenchmarks for the Hot Potato combat message path.
+
+Replays synthetic punch, bomb and grab message streams through
+PotatoPlayerSpaz.handlemessage, plus direct HotPotato.pass_mark calls,
+on the headless engine at several lobby sizes. For every stream it
+reports per-message latency percentiles and allocations.
+
+    python benchmarks/bench_handlemessage.py
+    python benchmarks/bench_handlemessage.py --sizes 8,32 --messages 5000
+    python benchmarks/bench_handlemessage.py --json > baseline.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from typing import TYPE_CHECKING
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import headless  # noqa: E402
+import bascenev1 as bs  # noqa: E402
+from bascenev1._engine import engine  # noqa: E402
+from bascenev1._nodes import Collision  # noqa: E402
+from bascenev1lib.actor.spaz import PickupMessage  # noqa: E402
+
+import hot_potato  # noqa: E402
+
+if TYPE_CHECKING:
+    from typing import Any, Callable
+
+STREAMS = ('punch', 'bomb', 'grab', 'pass_mark')
+DEFAULT_SIZES = (2, 8, 32, 128)
+
+
+def _start_game(size: int, seed: int) -> headless.Host:
+    host = headless.Host(hot_potato.HotPotato, players=size, seed=seed)
+    host.begin()
+    # Play until the first mark goes out so there's something to pass.
+    while not host.activity.get_marked_players():
+        host.run(0.5)
+    # Let spawn invincibility wear off.
+    host.run(1.0)
+    return host
+
+
+def _pick_pair(rng: random.Random, host: headless.Host) -> tuple[Any, Any]:
+    activity = host.activity
+    players = [p for p in activity.players if p.is_alive()]
+    marked = activity.get_marked_players()
+    # Half the time make the marked player the attacker so the mark moves.
+    if marked and rng.random() < 0.5:
+        attacker = rng.choice(marked)
+    else:
+        attacker = rng.choice(players)
+    victim = rng.choice(players)
+    while victim is attacker:
+        victim = rng.choice(players)
+    return attacker, victim
+
+
+def _make_call(stream: str, host: headless.Host,
+               rng: random.Random) -> Callable[[], Any]:
+    """Build one message delivery; all setup happens outside the timing."""
+    attacker, victim = _pick_pair(rng, host)
+    if stream == 'pass_mark':
+        return lambda: host.activity.pass_mark(attacker, victim)
+    if stream == 'grab':
+        collision = Collision(opposingnode=victim.actor.node,
+                              sourcenode=attacker.actor.node)
+        msg: Any = PickupMessage()
+        actor = attacker.actor
+
+        def _grab() -> Any:
+            engine.collision = collision
+            try:
+                return actor.handlemessage(msg)
+            finally:
+                engine.collision = None
+        return _grab
+    if stream == 'punch':
+        magnitude = rng.uniform(100.0, 900.0)
+        msg = bs.HitMessage(
+            pos=victim.actor.node.position, velocity=(1.0, 0.0, 0.0),
+            magnitude=magnitude, velocity_magnitude=magnitude * 0.5,
+            radius=0.4, source_player=attacker, hit_type='punch',
+            force_direction=(1.0, 0.0, 0.0))
+    else:
+        msg = bs.HitMessage(
+            pos=victim.actor.node.position, velocity=(0.0, 1.0, 0.0),
+            magnitude=rng.uniform(500.0, 2000.0), radius=2.0,
+            source_player=attacker, hit_type='explosion',
+            hit_subtype='normal', force_direction=(0.0, 1.0, 0.0))
+    actor = victim.actor
+    return lambda: actor.handlemessage(msg)
+
+
+def _percentile(sorted_values: list[int], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index] / 1000.0
+
+
+def run_stream(stream: str, size: int, messages: int,
+               seed: int) -> dict[str, Any]:
+    """Replay one stream; latencies in microseconds, allocations in bytes."""
+    rng = random.Random(seed)
+    host = _start_game(size, seed)
+    samples: list[int] = []
+    perf = time.perf_counter_ns
+    with engine.context(host.activity):
+        calls = [_make_call(stream, host, rng) for _ in range(messages)]
+        gc.collect()
+        gc.disable()
+        try:
+            for call in calls:
+                start = perf()
+                call()
+                samples.append(perf() - start)
+        finally:
+            gc.enable()
+
+    # Allocations are measured on a separate replay of the same stream,
+    # since tracing slows everything down too much to trust the timings.
+    rng = random.Random(seed)
+    host = _start_game(size, seed)
+    with engine.context(host.activity):
+        calls = [_make_call(stream, host, rng) for _ in range(messages)]
+        gc.collect()
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        for call in calls:
+            call()
+        after, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    samples.sort()
+    return {
+        'stream': stream,
+        'players': size,
+        'messages': messages,
+        'p50_us': _percentile(samples, 0.50),
+        'p90_us': _percentile(samples, 0.90),
+        'p99_us': _percentile(samples, 0.99),
+        'max_us': samples[-1] / 1000.0,
+        'mean_us': sum(samples) / len(samples) / 1000.0,
+        'retained_bytes_per_msg': (after - before) / messages,
+        'peak_bytes': peak - before,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='comma separated lobby sizes')
+    parser.add_argument('--streams', default=','.join(STREAMS),
+                        help='comma separated streams to run')
+    parser.add_argument('--messages', type=int, default=2000,
+                        help='messages per stream')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', action='store_true',
+                        help='print results as JSON')
+    args = parser.parse_args()
+
+    results = [run_stream(stream, int(size), args.messages, args.seed)
+               for size in args.sizes.split(',')
+               for stream in args.streams.split(',')]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f'{"stream":<10}{"players":>8}{"p50 us":>9}{"p90 us":>9}'
+          f'{"p99 us":>9}{"max us":>10}{"B/msg":>9}{"peak B":>10}')
+    for res in results:
+        print(f'{res["stream"]:<10}{res["players"]:>8}{res["p50_us"]:>9.1f}'
+              f'{res["p90_us"]:>9.1f}{res["p99_us"]:>9.1f}'
+              f'{res["max_us"]:>10.1f}{res["retained_bytes_per_msg"]:>9.1f}'
+              f'{res["peak_bytes"]:>10}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""Import-time benchmark for the game modes.
+
+Imports each mode in a fresh interpreter on the headless engine, the way
+the game imports every plugin at boot, and reports how long the import
+took and which bascenev1lib actor modules it pulled in. It then times
+constructing the first activity, which is where deferred imports now
+happen. babase and bascenev1 are imported before timing starts, since the
+game has them loaded long before it looks at plugins.
+
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --repeat 50 --baseline HEAD~1
+    python benchmarks/bench_import.py --json > import.json
+
+--baseline also measures the modes as they were at a git revision, for a
+before/after comparison.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = {'hot_potato': 'HotPotato', 'arms_race': 'ArmsRaceGame'}
+# Shared modules the modes may import. They get copied along with the modes for --baseline.
+SHARED = ('perf_hooks.py',)
+
+_PROBE = '''
+import json, sys, time
+sys.path.insert(0, {root!r})
+import headless
+sys.path[:0] = {path!r}
+import babase, bascenev1
+before = set(sys.modules)
+start = time.perf_counter()
+import {module}
+imported = time.perf_counter() - start
+loaded = sorted(m for m in set(sys.modules) - before if m.startswith('bascenev1lib'))
+from headless.host import Host
+start = time.perf_counter()
+Host({module}.{activity}, players=2, seed=0)
+constructed = time.perf_counter() - start
+print(json.dumps({{'import_s': imported, 'construct_s': constructed, 'actor_modules': loaded}}))
+'''
+
+
+def probe(module: str, path: list[str]) -> dict[str, Any]:
+    code = _PROBE.format(root=ROOT, path=path, module=module, activity=MODES[module])
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure(module: str, path: list[str], repeat: int) -> dict[str, Any]:
+    runs = [probe(module, path) for _ in range(repeat)]
+    return {
+        'import_ms': statistics.median(run['import_s'] for run in runs) * 1000,
+        'construct_ms': statistics.median(run['construct_s'] for run in runs) * 1000,
+        'actor_modules': runs[0]['actor_modules'],
+    }
+
+
+def checkout(revision: str, directory: str) -> None:
+    for name in [f'{module}.py' for module in MODES] + list(SHARED):
+        result = subprocess.run(['git', 'show', f'{revision}:{name}'], cwd=ROOT, capture_output=True)
+        if result.returncode == 0:
+            with open(os.path.join(directory, name), 'wb') as outfile:
+                outfile.write(result.stdout)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20, help='fresh interpreters per measurement')
+    parser.add_argument('--baseline', metavar='REV', help='also measure the modes at this git revision')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    results: dict[str, dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory() as baseline_dir:
+        trees = [('current', [ROOT])]
+        if args.baseline:
+            checkout(args.baseline, baseline_dir)
+            trees.append((args.baseline, [baseline_dir]))
+        for label, path in trees:
+            for module in MODES:
+                results[f'{module} @ {label}'] = measure(module, path, args.repeat)
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+    print(f'{"module":<30}{"import ms":>11}{"first game ms":>15}  actor modules loaded by import')
+    for name, result in results.items():
+        modules = ', '.join(m.rsplit('.', 1)[-1] for m in result['actor_modules']) or '-'
+        print(f'{name:<30}{result["import_ms"]:>11.2f}{result["construct_ms"]:>15.2f}  {modules}')
+
+
+if __name__ == '__main__':
+    main()
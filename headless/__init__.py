@@ -0,0 +1,43 @@
+"""A headless stand-in for the BombSquad engine.
+
+Importing this package puts fake babase, bascenev1 and bascenev1lib
+modules on the path, so the game modes in this repo can be imported and
+driven without the game binary::
+
+    import headless
+    import hot_potato
+
+    host = headless.Host(hot_potato.HotPotato, players=8, seed=1)
+    host.begin()
+    host.run_until_ended()
+    print(host.snapshot())
+
+Nodes only store attributes, timers run on a virtual clock that moves as
+fast as the CPU allows, and effects and sounds are only counted.
+"""
+
+import os
+import sys
+import typing
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+for _path in (os.path.dirname(_HERE), os.path.join(_HERE, 'engine')):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+# The game ships Python 3.12+; allow older interpreters to import the modes.
+if not hasattr(typing, 'override'):
+    typing.override = lambda method: method
+
+from bascenev1._engine import engine  # noqa: E402
+
+__all__ = ['Host', 'engine']
+
+
+def __getattr__(name: str):
+    # Host pulls in the actor modules, which import-time measurements want left alone.
+    if name == 'Host':
+        from headless.host import Host
+        return Host
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,158 @@
+"""Headless stand-in for the babase engine module.
+
+Only the parts the game modes in this repo touch are provided.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import traceback
+import weakref
+from enum import Enum
+from typing import TYPE_CHECKING
+
+from babase._language import Lstr
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Sequence
+
+
+class SpecialChar(Enum):
+    """Special characters the game font provides."""
+
+    TOP_BUTTON = 6
+    HAL = 26
+    SKULL = 30
+    MOON = 31
+
+
+def charstr(char_id: SpecialChar) -> str:
+    """Return a unicode string for a special character."""
+    return chr(0xE000 + char_id.value)
+
+
+class NotFoundError(Exception):
+    """Something requested was not found."""
+
+
+class ActivityNotFoundError(NotFoundError):
+    """The activity referenced no longer exists."""
+
+
+def print_exception(*args: Any, **keywds: Any) -> None:
+    """Print the exception being handled, with an optional message first."""
+    if args:
+        print(*args, file=sys.stderr)
+    traceback.print_exc()
+
+
+class Call:
+    """Wraps a callable and arguments into a single callable object."""
+
+    def __init__(self, call: Callable, *args: Any, **kwargs: Any) -> None:
+        self._call = call
+        self._args = args
+        self._kwargs = kwargs
+
+    def __call__(self, *args: Any) -> Any:
+        return self._call(*self._args + args, **self._kwargs)
+
+
+class WeakCall:
+    """Like Call, but only holds a weak reference to a bound method's object.
+
+    Calling it after the object has died does nothing.
+    """
+
+    def __init__(self, call: Callable, *args: Any, **kwargs: Any) -> None:
+        if hasattr(call, '__self__'):
+            self._call: Callable[[], Callable | None] = weakref.WeakMethod(
+                call)  # type: ignore[arg-type]
+        else:
+            self._call = lambda: call
+        self._args = args
+        self._kwargs = kwargs
+
+    def __call__(self, *args: Any) -> Any:
+        call = self._call()
+        if call is None:
+            return None
+        return call(*self._args + args, **self._kwargs)
+
+
+class Setting:
+    """A setting a game mode can expose."""
+
+    def __init__(self, name: str, default: Any) -> None:
+        self.name = name
+        self.default = default
+
+
+class BoolSetting(Setting):
+    """A boolean game setting."""
+
+
+class IntSetting(Setting):
+    """An integer game setting."""
+
+    def __init__(self, name: str, default: int, min_value: int = 0,
+                 max_value: int = 9999, increment: int = 1) -> None:
+        super().__init__(name, default)
+        self.min_value = min_value
+        self.max_value = max_value
+        self.increment = increment
+
+
+class FloatSetting(Setting):
+    """A floating point game setting."""
+
+    def __init__(self, name: str, default: float, min_value: float = 0.0,
+                 max_value: float = 9999.0, increment: float = 1.0) -> None:
+        super().__init__(name, default)
+        self.min_value = min_value
+        self.max_value = max_value
+        self.increment = increment
+
+
+class ChoiceSetting(Setting):
+    """A setting picked from a list of named choices."""
+
+    def __init__(self, name: str, default: Any,
+                 choices: Sequence[tuple[str, Any]]) -> None:
+        super().__init__(name, default)
+        self.choices = list(choices)
+
+
+class IntChoiceSetting(ChoiceSetting):
+    """An integer setting picked from a list of choices."""
+
+
+class FloatChoiceSetting(ChoiceSetting):
+    """A float setting picked from a list of choices."""
+
+
+class _Env:
+    vr = False
+    python_directory_user = os.path.join(tempfile.gettempdir(),
+                                         'headless_mods')
+
+
+class _ClassicSubsystem:
+    _MAPS = {'melee': ['Big G', 'Bridgit', 'Courtyard', 'Crag Castle',
+                       'Doom Shroom', 'Football Stadium', 'Happy Thoughts',
+                       'Hockey Stadium', 'Lake Frigid', 'Monkey Face',
+                       'Rampage', 'Roundabout', 'Step Right Up',
+                       'The Pad', 'Tip Top', 'Tower D', 'Zigzag']}
+
+    def getmaps(self, playtype: str) -> list[str]:
+        return list(self._MAPS.get(playtype, []))
+
+
+class _App:
+    env = _Env()
+    classic = _ClassicSubsystem()
+
+
+app = _App()
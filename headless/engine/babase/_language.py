@@ -0,0 +1,26 @@
+"""Headless stand-in for babase._language."""
+
+from __future__ import annotations
+
+from typing import Any
+
+
+class Lstr:
+    """A translatable string; headless builds only keep the arguments."""
+
+    def __init__(self, **kwargs: Any) -> None:
+        self.args = kwargs
+
+    def evaluate(self) -> str:
+        value = self.args.get('value')
+        if value is None:
+            value = str(self.args.get('resource')
+                        or self.args.get('translate', ('', ''))[1])
+        for sub, replacement in self.args.get('subs', []):
+            if isinstance(replacement, Lstr):
+                replacement = replacement.evaluate()
+            value = value.replace(sub, str(replacement))
+        return value
+
+    def __repr__(self) -> str:
+        return f'Lstr({self.evaluate()!r})'
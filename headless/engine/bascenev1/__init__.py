@@ -0,0 +1,39 @@
+"""Headless stand-in for the bascenev1 engine module.
+
+Nodes only store their attributes, timers run on a virtual clock that
+moves when the host says so, and effects and sounds are merely counted
+(see bascenev1._engine.engine.counters).
+"""
+
+from babase import (
+    Lstr, Call, WeakCall, NotFoundError, ActivityNotFoundError, Setting,
+    BoolSetting, IntSetting, FloatSetting, ChoiceSetting, IntChoiceSetting,
+    FloatChoiceSetting, app)
+from bascenev1._engine import Timer, timer, time, getactivity
+from bascenev1._nodes import (Node, newnode, getnodes, animate, emitfx,
+                              getcollision)
+from bascenev1._assets import (Sound, Texture, Mesh, getsound, gettexture,
+                               getmesh)
+from bascenev1._messages import (
+    UNHANDLED, DeathType, DieMessage, OutOfBoundsMessage, StandMessage,
+    HitMessage, PlayerDiedMessage)
+from bascenev1._actor import Actor, NodeActor
+from bascenev1._player import Player, Team
+from bascenev1._activity import (
+    Session, DualTeamSession, FreeForAllSession, MusicType, ScoreType,
+    ScoreConfig, GameResults, Map, Activity, GameActivity, TeamGameActivity,
+    safecolor, normalized_color)
+
+__all__ = [
+    'Lstr', 'Call', 'WeakCall', 'NotFoundError', 'ActivityNotFoundError',
+    'Setting', 'BoolSetting', 'IntSetting', 'FloatSetting', 'ChoiceSetting',
+    'IntChoiceSetting', 'FloatChoiceSetting', 'app', 'Timer', 'timer',
+    'time', 'getactivity', 'Node', 'newnode', 'getnodes', 'animate',
+    'emitfx', 'getcollision', 'Sound', 'Texture', 'Mesh', 'getsound',
+    'gettexture', 'getmesh', 'UNHANDLED', 'DeathType', 'DieMessage',
+    'OutOfBoundsMessage', 'StandMessage', 'HitMessage', 'PlayerDiedMessage',
+    'Actor', 'NodeActor', 'Player', 'Team', 'Session', 'DualTeamSession',
+    'FreeForAllSession', 'MusicType', 'ScoreType', 'ScoreConfig',
+    'GameResults', 'Map', 'Activity', 'GameActivity', 'TeamGameActivity',
+    'safecolor', 'normalized_color',
+]
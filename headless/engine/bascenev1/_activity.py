@@ -0,0 +1,358 @@
+"""Headless activities, sessions, maps and stats."""
+
+from __future__ import annotations
+
+import random
+import typing
+from enum import Enum
+from typing import TYPE_CHECKING, Generic
+
+from bascenev1._assets import getsound
+from bascenev1._engine import Timer, timer
+from bascenev1._messages import PlayerDiedMessage, UNHANDLED
+from bascenev1._player import Player, PlayerT, Team, TeamT
+from babase import WeakCall
+
+if TYPE_CHECKING:
+    from typing import Any, Sequence
+
+    from bascenev1._actor import Actor
+
+
+class Session:
+    """A series of activities."""
+
+
+class DualTeamSession(Session):
+    """Two teams playing against each other."""
+
+
+class FreeForAllSession(Session):
+    """Every player for themselves."""
+
+
+class MusicType(Enum):
+    """Music the game can play."""
+
+    EPIC = 'Epic'
+    SCARY = 'Scary'
+    TO_THE_DEATH = 'ToTheDeath'
+
+
+class ScoreType(Enum):
+    """How scores are presented."""
+
+    SECONDS = 's'
+    MILLISECONDS = 'ms'
+    POINTS = 'p'
+
+
+class ScoreConfig:
+    """How a game's scores should be shown."""
+
+    def __init__(self, label: str = 'Score',
+                 scoretype: ScoreType = ScoreType.POINTS,
+                 lower_is_better: bool = False,
+                 none_is_winner: bool = False, version: str = '') -> None:
+        self.label = label
+        self.scoretype = scoretype
+        self.lower_is_better = lower_is_better
+        self.none_is_winner = none_is_winner
+        self.version = version
+
+
+class GameResults:
+    """Final scores of a game."""
+
+    def __init__(self) -> None:
+        self.scores: dict[Team, int | None] = {}
+
+    def set_team_score(self, team: Team, score: int | None) -> None:
+        self.scores[team] = score
+
+
+class Stats:
+    """Tallies kills, deaths and points."""
+
+    def __init__(self) -> None:
+        self.scores: dict[Player, int] = {}
+        self.kills: dict[Player, int] = {}
+        self.deaths: dict[Player, int] = {}
+
+    def player_scored(self, player: Player, base_points: int = 1,
+                      target: Sequence[float] | None = None,
+                      kill: bool = False, victim_player: Player | None = None,
+                      **kwargs: Any) -> None:
+        self.scores[player] = self.scores.get(player, 0) + base_points
+        if kill:
+            self.kills[player] = self.kills.get(player, 0) + 1
+
+    def player_was_killed(self, player: Player, killed: bool = False,
+                          killer: Player | None = None) -> None:
+        self.deaths[player] = self.deaths.get(player, 0) + 1
+
+
+class Map:
+    """A map with a handful of spawn points."""
+
+    def __init__(self, name: str = 'Doom Shroom',
+                 ffa_spawn_points: Sequence[Sequence[float]] | None = None
+                 ) -> None:
+        self.name = name
+        self.ffa_spawn_points = list(ffa_spawn_points or [
+            (-5.0, 2.5, -3.0, 1.0, 0.0, 1.0),
+            (5.0, 2.5, -3.0, 1.0, 0.0, 1.0),
+            (-5.0, 2.5, 3.0, 1.0, 0.0, 1.0),
+            (5.0, 2.5, 3.0, 1.0, 0.0, 1.0),
+            (0.0, 2.5, -5.0, 1.0, 0.0, 1.0),
+            (0.0, 2.5, 5.0, 1.0, 0.0, 1.0),
+            (-7.0, 2.5, 0.0, 1.0, 0.0, 1.0),
+            (7.0, 2.5, 0.0, 1.0, 0.0, 1.0),
+        ])
+        self.spawn_points = self.ffa_spawn_points[:2]
+        self._next_ffa_start_index = 0
+
+    def get_start_position(self, team_index: int) -> Sequence[float]:
+        point = self.spawn_points[team_index % len(self.spawn_points)]
+        return point[0], point[1], point[2]
+
+    def _getpt(self) -> tuple[float, float, float]:
+        point = self.ffa_spawn_points[self._next_ffa_start_index]
+        self._next_ffa_start_index = ((self._next_ffa_start_index + 1)
+                                      % len(self.ffa_spawn_points))
+        return (point[0] + random.uniform(-point[3], point[3]), point[1],
+                point[2] + random.uniform(-point[5], point[5]))
+
+    def get_ffa_start_position(self,
+                               players: Sequence[Player]) -> Sequence[float]:
+        """Pick a spawn point far away from everyone, like the real map."""
+        player_pts = [player.node.position for player in players
+                      if player.is_alive()]
+        if not player_pts:
+            return self._getpt()
+        farthest_dist = -1.0
+        farthest_pt = self._getpt()
+        for _ in range(10):
+            test_pt = self._getpt()
+            closest = min((test_pt[0] - pt[0]) ** 2 + (test_pt[2] - pt[2]) ** 2
+                          for pt in player_pts)
+            if closest > farthest_dist:
+                farthest_dist = closest
+                farthest_pt = test_pt
+        return farthest_pt
+
+
+def safecolor(color: Sequence[float],
+              target_intensity: float = 0.6) -> tuple[float, ...]:
+    """Brighten a color until it is readable."""
+    intensity = max(sum(color[:3]), 0.0001)
+    scale = max(1.0, target_intensity * 3.0 / intensity)
+    return tuple(min(1.0, c * scale) for c in color)
+
+
+def normalized_color(color: Sequence[float]) -> tuple[float, ...]:
+    """Scale a color so its brightest channel is 1."""
+    brightest = max(max(color), 0.0001)
+    return tuple(c / brightest for c in color)
+
+
+def _generic_args(cls: type) -> tuple:
+    for klass in cls.__mro__:
+        for base in getattr(klass, '__orig_bases__', ()):
+            args = typing.get_args(base)
+            if len(args) == 2 and all(isinstance(a, type) for a in args):
+                return args
+    return Player, Team
+
+
+class Activity(Generic[PlayerT, TeamT]):
+    """A unit of gameplay running in a session."""
+
+    slow_motion = False
+    default_music: MusicType | None = None
+
+    def __init__(self, settings: dict) -> None:
+        self.settings_raw = settings
+        self.playertype, self.teamtype = _generic_args(type(self))
+        self.players: list[PlayerT] = []
+        self.teams: list[TeamT] = []
+        self.customdata: dict = {}
+        self.session: Session = FreeForAllSession()
+        self._has_begun = False
+        self._has_ended = False
+        self._retained_actors: list[Actor] = []
+        self.actor_count = 0
+        self.results: GameResults | None = None
+
+    def add_actor_weak_ref(self, actor: Actor) -> None:
+        self.actor_count += 1
+
+    def retain_actor(self, actor: Actor) -> None:
+        self._retained_actors.append(actor)
+
+    def has_begun(self) -> bool:
+        return self._has_begun
+
+    def has_ended(self) -> bool:
+        return self._has_ended
+
+    def on_player_join(self, player: PlayerT) -> None:
+        pass
+
+    def on_player_leave(self, player: PlayerT) -> None:
+        pass
+
+    def on_begin(self) -> None:
+        pass
+
+    def handlemessage(self, msg: Any) -> Any:
+        return UNHANDLED
+
+    def end(self, results: Any = None, delay: float = 0.0,
+            force: bool = False) -> None:
+        if self._has_ended and not force:
+            return
+        self._has_ended = True
+        self.results = results
+
+
+class GameActivity(Activity[PlayerT, TeamT]):
+    """An activity with players competing for a score."""
+
+    name: str | None = None
+    description: str | None = None
+    tips: list = []
+    available_settings: list | None = None
+    scoreconfig: ScoreConfig | None = None
+    announce_player_deaths = False
+    show_kill_points = True
+    allow_mid_activity_joins = True
+
+    @classmethod
+    def getname(cls) -> str:
+        return cls.name if cls.name is not None else cls.__name__
+
+    @classmethod
+    def get_display_string(cls, settings: dict | None = None) -> Any:
+        from babase import Lstr
+        return Lstr(value=cls.getname())
+
+    @classmethod
+    def get_available_settings(cls, sessiontype: type[Session]) -> list:
+        return list(cls.available_settings or [])
+
+    @classmethod
+    def supports_session_type(cls, sessiontype: type[Session]) -> bool:
+        return True
+
+    @classmethod
+    def get_supported_maps(cls, sessiontype: type[Session]) -> list[str]:
+        return []
+
+    def __init__(self, settings: dict) -> None:
+        super().__init__(settings)
+        self.map = Map()
+        self.stats = Stats()
+        self._spawn_sound = getsound('spawn')
+        self._standard_time_limit_timer: Timer | None = None
+
+    def on_begin(self) -> None:
+        super().on_begin()
+        if self.tips:
+            self._show_tip()
+
+    def _show_tip(self) -> None:
+        pass
+
+    def on_player_join(self, player: PlayerT) -> None:
+        self.spawn_player(player)
+
+    def setup_standard_time_limit(self, duration: float) -> None:
+        if duration <= 0.0:
+            return
+        self._standard_time_limit_timer = Timer(duration,
+                                                WeakCall(self.end_game))
+
+    def end_game(self) -> None:
+        self.end()
+
+    def handlemessage(self, msg: Any) -> Any:
+        if isinstance(msg, PlayerDiedMessage):
+            player = msg.getplayer(self.playertype)
+            killer = msg.getkillerplayer(self.playertype)
+            self.stats.player_was_killed(player, killed=msg.killed,
+                                         killer=killer)
+            return None
+        return super().handlemessage(msg)
+
+    def spawn_player(self, player: PlayerT) -> Actor:
+        return self.spawn_player_spaz(player)
+
+    def spawn_player_if_exists(self, player: PlayerT) -> None:
+        if player:
+            self.spawn_player(player)
+
+    def respawn_player(self, player: PlayerT,
+                       respawn_time: float | None = None) -> None:
+        if respawn_time is None:
+            teamsize = len(player.team.players)
+            if teamsize == 1:
+                respawn_time = 3.0
+            elif teamsize == 2:
+                respawn_time = 5.0
+            elif teamsize == 3:
+                respawn_time = 6.0
+            else:
+                respawn_time = 7.0
+        if 'Respawn Times' in self.settings_raw:
+            respawn_time *= self.settings_raw['Respawn Times']
+        respawn_time = round(max(1.0, respawn_time), 0)
+        if player.actor and not self.has_ended():
+            from bascenev1lib.actor.respawnicon import RespawnIcon
+            player.customdata['respawn_timer'] = Timer(
+                respawn_time, WeakCall(self.spawn_player_if_exists, player))
+            player.customdata['respawn_icon'] = RespawnIcon(player,
+                                                            respawn_time)
+
+    def spawn_player_spaz(self, player: PlayerT,
+                          position: Sequence[float] = (0, 0, 0),
+                          angle: float | None = None) -> Actor:
+        from babase import Lstr
+        from bascenev1._messages import StandMessage
+        from bascenev1._nodes import animate, newnode
+        from bascenev1lib.actor.playerspaz import PlayerSpaz
+
+        light_color = normalized_color(player.color)
+        spaz = PlayerSpaz(color=player.color, highlight=player.highlight,
+                          character=player.character, player=player)
+        player.actor = spaz
+        spaz.node.name = Lstr(value=player.getname())
+        spaz.node.name_color = safecolor(player.color)
+        spaz.connect_controls_to_player()
+        spaz.handlemessage(StandMessage(
+            position, angle if angle is not None else random.uniform(0, 360)))
+        self._spawn_sound.play(1.0, position=spaz.node.position)
+        light = newnode('light', attrs={'color': light_color})
+        spaz.node.connectattr('position', light, 'position')
+        animate(light, 'intensity', {0: 0, 0.25: 1, 0.5: 0})
+        timer(0.5, light.delete)
+        return spaz
+
+
+class TeamGameActivity(GameActivity[PlayerT, TeamT]):
+    """A game played by teams or free-for-all players."""
+
+    def spawn_player_spaz(self, player: PlayerT,
+                          position: Sequence[float] | None = None,
+                          angle: float | None = None) -> Actor:
+        if position is None:
+            if isinstance(self.session, DualTeamSession):
+                position = self.map.get_start_position(player.team.id)
+            else:
+                position = self.map.get_ffa_start_position(self.players)
+        return super().spawn_player_spaz(player, position, angle)
+
+    def end(self, results: Any = None, announce_winning_team: bool = True,
+            announce_delay: float = 0.1, force: bool = False) -> None:
+        super().end(results, force=force)
+
@@ -0,0 +1,72 @@
+"""Headless Actor base class."""
+
+from __future__ import annotations
+
+import weakref
+from typing import TYPE_CHECKING
+
+from babase import ActivityNotFoundError
+from bascenev1._engine import engine
+from bascenev1._messages import UNHANDLED
+
+if TYPE_CHECKING:
+    from typing import Any
+
+    from bascenev1._activity import Activity
+
+
+class Actor:
+    """A high level game object living in an activity."""
+
+    def __init__(self) -> None:
+        activity = engine.activity
+        if activity is None:
+            raise ActivityNotFoundError('Actors need an activity context.')
+        self._activity = weakref.ref(activity)
+        activity.add_actor_weak_ref(self)
+
+    def handlemessage(self, msg: Any) -> Any:
+        return UNHANDLED
+
+    def autoretain(self) -> Actor:
+        """Keep this actor alive for as long as it exists."""
+        activity = self._activity()
+        if activity is not None:
+            activity.retain_actor(self)
+        return self
+
+    def on_expire(self) -> None:
+        pass
+
+    def exists(self) -> bool:
+        return True
+
+    def is_alive(self) -> bool:
+        return True
+
+    def __bool__(self) -> bool:
+        return self.exists()
+
+    @property
+    def activity(self) -> Activity:
+        activity = self._activity()
+        if activity is None:
+            raise ActivityNotFoundError()
+        return activity
+
+    def getactivity(self, doraise: bool = True) -> Activity | None:
+        activity = self._activity()
+        if activity is None and doraise:
+            raise ActivityNotFoundError()
+        return activity
+
+
+class NodeActor(Actor):
+    """An actor wrapping a single node."""
+
+    def __init__(self, node: Any) -> None:
+        super().__init__()
+        self.node = node
+
+    def exists(self) -> bool:
+        return bool(self.node)
@@ -0,0 +1,51 @@
+"""Headless sounds, textures and meshes."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from bascenev1._engine import engine
+
+if TYPE_CHECKING:
+    from typing import Sequence
+
+
+class Sound:
+    """A sound asset."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def play(self, volume: float = 1.0,
+             position: Sequence[float] | None = None,
+             host_only: bool = False) -> None:
+        engine.counters['sounds_played'] += 1
+
+
+class Texture:
+    """A texture asset."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+
+class Mesh:
+    """A mesh asset."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+
+def getsound(name: str) -> Sound:
+    engine.counters['asset_lookups'] += 1
+    return Sound(name)
+
+
+def gettexture(name: str) -> Texture:
+    engine.counters['asset_lookups'] += 1
+    return Texture(name)
+
+
+def getmesh(name: str) -> Mesh:
+    engine.counters['asset_lookups'] += 1
+    return Mesh(name)
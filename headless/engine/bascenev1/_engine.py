@@ -0,0 +1,134 @@
+"""The virtual clock and bookkeeping behind the headless engine."""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+from collections import Counter
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Callable
+
+    from bascenev1._activity import Activity
+    from bascenev1._nodes import Node, Collision
+
+
+class TimerEntry:
+    """A pending call on the virtual clock."""
+
+    __slots__ = ('call', 'interval', 'alive', 'activity')
+
+    def __init__(self, call: Callable[[], Any], interval: float,
+                 activity: Activity | None) -> None:
+        self.call = call
+        self.interval = interval
+        self.alive = True
+        self.activity = activity
+
+
+class Engine:
+    """Global state of the headless engine.
+
+    Time only moves when something calls run_until(), so a game can be
+    driven as fast as the CPU allows.
+    """
+
+    def __init__(self) -> None:
+        self.time = 0.0
+        self._queue: list[tuple[float, int, TimerEntry]] = []
+        self._seq = itertools.count()
+        self.nodes: dict[int, Node] = {}
+        self.activity: Activity | None = None
+        self.collision: Collision | None = None
+        self.counters: Counter[str] = Counter()
+
+    def reset(self) -> None:
+        """Forget all timers, nodes and counters."""
+        self.__init__()  # type: ignore[misc]
+
+    def add_timer(self, time: float, call: Callable[[], Any],
+                  repeat: bool = False) -> TimerEntry:
+        entry = TimerEntry(call, time if repeat else 0.0, self.activity)
+        heapq.heappush(self._queue,
+                       (self.time + time, next(self._seq), entry))
+        self.counters['timers_created'] += 1
+        return entry
+
+    def next_due(self) -> float | None:
+        """Time of the earliest pending timer, if any."""
+        while self._queue and not self._queue[0][2].alive:
+            heapq.heappop(self._queue)
+        return self._queue[0][0] if self._queue else None
+
+    def live_timers(self) -> int:
+        return sum(1 for _, _, entry in self._queue if entry.alive)
+
+    def run_until(self, time: float) -> None:
+        """Advance the clock, firing every timer due on the way."""
+        queue = self._queue
+        while queue and queue[0][0] <= time:
+            due, _, entry = heapq.heappop(queue)
+            if not entry.alive:
+                continue
+            self.time = due
+            if entry.interval:
+                heapq.heappush(queue,
+                               (due + entry.interval, next(self._seq), entry))
+            else:
+                entry.alive = False
+            self.counters['timer_calls'] += 1
+            with self.context(entry.activity):
+                entry.call()
+        self.time = max(self.time, time)
+
+    def context(self, activity: Activity | None) -> _Context:
+        return _Context(self, activity)
+
+
+class _Context:
+    __slots__ = ('_engine', '_activity', '_prev')
+
+    def __init__(self, engine: Engine, activity: Activity | None) -> None:
+        self._engine = engine
+        self._activity = activity
+        self._prev: Activity | None = None
+
+    def __enter__(self) -> None:
+        self._prev = self._engine.activity
+        self._engine.activity = self._activity
+
+    def __exit__(self, *args: Any) -> None:
+        self._engine.activity = self._prev
+
+
+engine = Engine()
+
+
+class Timer:
+    """A timer that runs as long as this object is referenced."""
+
+    def __init__(self, time: float, call: Callable[[], Any],
+                 repeat: bool = False) -> None:
+        self._entry = engine.add_timer(time, call, repeat)
+
+    def __del__(self) -> None:
+        self._entry.alive = False
+
+
+def timer(time: float, call: Callable[[], Any], repeat: bool = False) -> None:
+    """Schedule a call that can't be cancelled."""
+    engine.add_timer(time, call, repeat)
+
+
+def time() -> float:
+    """Current virtual game time in seconds."""
+    return engine.time
+
+
+def getactivity(doraise: bool = True) -> Activity | None:
+    """Return the activity of the current context."""
+    if engine.activity is None and doraise:
+        from babase import ActivityNotFoundError
+        raise ActivityNotFoundError('No activity in the current context.')
+    return engine.activity
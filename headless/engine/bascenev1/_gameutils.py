@@ -0,0 +1,22 @@
+"""Headless stand-in for bascenev1._gameutils."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from bascenev1._nodes import animate
+
+if TYPE_CHECKING:
+    from bascenev1._assets import Sound, Texture
+
+__all__ = ['animate', 'GameTip']
+
+
+@dataclass
+class GameTip:
+    """A tip shown at the start of a game."""
+
+    text: str
+    icon: Texture | None = None
+    sound: Sound | None = None
@@ -0,0 +1,102 @@
+"""Headless versions of the standard actor messages."""
+
+from __future__ import annotations
+
+from enum import Enum
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Sequence
+
+    from bascenev1._nodes import Node
+    from bascenev1._player import Player
+
+
+class _UnhandledType:
+    pass
+
+
+UNHANDLED = _UnhandledType()
+
+
+class DeathType(Enum):
+    """Ways an actor can die."""
+
+    GENERIC = 'generic'
+    OUT_OF_BOUNDS = 'out_of_bounds'
+    IMPACT = 'impact'
+    FALL = 'fall'
+    REACHED_GOAL = 'reached_goal'
+    LEFT_GAME = 'left_game'
+
+
+class DieMessage:
+    """Tells an actor to die."""
+
+    def __init__(self, immediate: bool = False,
+                 how: Any = DeathType.GENERIC) -> None:
+        self.immediate = immediate
+        self.how = how
+
+
+class OutOfBoundsMessage:
+    """Tells an actor it has left the map."""
+
+
+class StandMessage:
+    """Tells an actor to stand at a position."""
+
+    def __init__(self, position: Sequence[float] = (0.0, 0.0, 0.0),
+                 angle: float = 0.0) -> None:
+        self.position = position
+        self.angle = angle
+
+
+class HitMessage:
+    """Tells an actor it got hit."""
+
+    def __init__(self, srcnode: Node | None = None,
+                 pos: Sequence[float] | None = None,
+                 velocity: Sequence[float] | None = None,
+                 magnitude: float = 1.0, velocity_magnitude: float = 0.0,
+                 radius: float = 1.0, source_player: Player | None = None,
+                 kick_back: float = 1.0, flat_damage: float | None = None,
+                 hit_type: str = 'generic',
+                 force_direction: Sequence[float] | None = None,
+                 hit_subtype: str = 'default') -> None:
+        self.srcnode = srcnode
+        self.pos = pos if pos is not None else (0.0, 0.0, 0.0)
+        self.velocity = velocity if velocity is not None else (0.0, 0.0, 0.0)
+        self.magnitude = magnitude
+        self.velocity_magnitude = velocity_magnitude
+        self.radius = radius
+        self._source_player = source_player
+        self.kick_back = kick_back
+        self.flat_damage = flat_damage
+        self.hit_type = hit_type
+        self.hit_subtype = hit_subtype
+        self.force_direction = (force_direction if force_direction is not None
+                                else self.velocity)
+
+    def get_source_player(self, playertype: type) -> Player | None:
+        player = self._source_player
+        return player if isinstance(player, playertype) and player else None
+
+
+class PlayerDiedMessage:
+    """Tells an activity one of its players died."""
+
+    def __init__(self, player: Player, was_killed: bool,
+                 killerplayer: Player | None, how: Any) -> None:
+        self.killed = was_killed
+        self.how = how
+        self._player = player
+        self._killerplayer = killerplayer
+
+    def getkillerplayer(self, playertype: type) -> Player | None:
+        player = self._killerplayer
+        return player if isinstance(player, playertype) and player else None
+
+    def getplayer(self, playertype: type) -> Player:
+        assert isinstance(self._player, playertype)
+        return self._player
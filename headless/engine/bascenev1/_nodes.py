@@ -0,0 +1,198 @@
+"""Headless nodes: plain attribute storage plus ownership and connections."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from babase import NotFoundError
+from bascenev1._engine import engine
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Sequence
+
+# Values unset attributes read as. Writing any attribute is allowed.
+_ATTR_DEFAULTS: dict[str, Any] = {
+    'position': (0.0, 0.0, 0.0),
+    'position_center': (0.0, 0.0, 0.0),
+    'torso_position': (0.0, 0.0, 0.0),
+    'velocity': (0.0, 0.0, 0.0),
+    'output': (0.0, 0.0, 0.0),
+    'knockout': 0.0,
+    'damage': 0,
+    'hurt': 0.0,
+    'dead': False,
+    'frozen': False,
+    'shattered': 0,
+    'invincible': False,
+    'source_player': None,
+    'intensity': 1.0,
+    'radius': 0.5,
+    'color': (1.0, 1.0, 1.0),
+    'opacity': 1.0,
+    'text': '',
+    'scale': 1.0,
+    'flatness': 1.0,
+}
+
+
+class Node:
+    """A scene node. Attributes are stored and replicated to no one."""
+
+    _INTERNAL = frozenset(('_type', '_attrs', '_alive', '_owned',
+                           '_death_actions', '_delegate', '_outputs'))
+
+    def __init__(self, nodetype: str, owner: Node | None = None,
+                 attrs: dict | None = None, delegate: Any = None) -> None:
+        setattr_ = object.__setattr__
+        setattr_(self, '_type', nodetype)
+        setattr_(self, '_attrs', dict(attrs) if attrs else {})
+        setattr_(self, '_alive', nodetype != '<null>')
+        setattr_(self, '_owned', [])
+        setattr_(self, '_death_actions', [])
+        setattr_(self, '_delegate', delegate)
+        # Connections from our attributes to other nodes' attributes.
+        setattr_(self, '_outputs', [])
+        if self._alive:
+            engine.nodes[id(self)] = self
+            engine.counters['nodes_created'] += 1
+            if owner is not None:
+                if owner:
+                    owner._owned.append(self)
+                else:
+                    # Owned by a dead node; dies immediately.
+                    self.delete()
+
+    def __getattr__(self, name: str) -> Any:
+        attrs = object.__getattribute__(self, '_attrs')
+        if name in attrs:
+            return attrs[name]
+        if name == 'hold_node':
+            return NULL_NODE
+        if name in _ATTR_DEFAULTS:
+            return _ATTR_DEFAULTS[name]
+        raise AttributeError(f'{self._type} node has no attribute {name!r}')
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in Node._INTERNAL:
+            object.__setattr__(self, name, value)
+            return
+        if not self._alive:
+            raise NotFoundError('Node does not exist.')
+        engine.counters['node_attr_writes'] += 1
+        self._attrs[name] = value
+        for srcattr, dstnode, dstattr in self._outputs:
+            if srcattr == name and dstnode:
+                setattr(dstnode, dstattr, value)
+
+    def __bool__(self) -> bool:
+        return self._alive
+
+    def __repr__(self) -> str:
+        state = '' if self._alive else ' (dead)'
+        return f'<headless {self._type} node{state}>'
+
+    def exists(self) -> bool:
+        return self._alive
+
+    def getnodetype(self) -> str:
+        return self._type
+
+    def getdelegate(self, type: type, doraise: bool = False) -> Any:
+        delegate = self._delegate
+        if isinstance(delegate, type):
+            return delegate
+        if doraise:
+            raise NotFoundError('Delegate not found.')
+        return None
+
+    def connectattr(self, srcattr: str, dstnode: Node, dstattr: str) -> None:
+        """Copy our attribute to dstnode now and whenever it changes."""
+        self._outputs.append((srcattr, dstnode, dstattr))
+        setattr(dstnode, dstattr, getattr(self, srcattr))
+
+    def handlemessage(self, *args: Any) -> None:
+        engine.counters['node_messages'] += 1
+        if args and args[0] == 'stand':
+            self._attrs['position'] = tuple(args[1:4])
+            self._attrs['velocity'] = (0.0, 0.0, 0.0)
+        elif args and args[0] == 'impulse':
+            # The real engine derives damage from the physics of the hit.
+            self._attrs['damage'] = int(args[7])
+
+    def add_death_action(self, call: Callable[[], Any]) -> None:
+        self._death_actions.append(call)
+
+    def delete(self, ignore_missing: bool = True) -> None:
+        if not self._alive:
+            return
+        object.__setattr__(self, '_alive', False)
+        engine.nodes.pop(id(self), None)
+        engine.counters['nodes_deleted'] += 1
+        for node in self._owned:
+            node.delete()
+        self._owned.clear()
+        self._outputs.clear()
+        for call in self._death_actions:
+            call()
+        self._death_actions.clear()
+
+
+NULL_NODE = Node('<null>')
+
+
+def newnode(type: str, owner: Node | None = None,
+            attrs: dict | None = None, delegate: Any = None) -> Node:
+    """Create a new node."""
+    return Node(type, owner=owner, attrs=attrs, delegate=delegate)
+
+
+def getnodes() -> list[Node]:
+    """Return all live nodes."""
+    return list(engine.nodes.values())
+
+
+def animate(node: Node, attr: str, keys: dict[float, float],
+            loop: bool = False, offset: float = 0.0) -> Node:
+    """Animate a node attribute.
+
+    Like the real engine this creates an 'animcurve' node owned by the
+    target. Headless builds jump to the first key and, unless looping,
+    land on the last key once the curve ends.
+    """
+    engine.counters['animations'] += 1
+    times = sorted(keys)
+    curve = newnode('animcurve', owner=node, attrs={'times': times})
+    setattr(node, attr, keys[times[0]])
+    if not loop:
+        def _finish() -> None:
+            if curve and node:
+                setattr(node, attr, keys[times[-1]])
+            curve.delete()
+        engine.add_timer(times[-1] + offset, _finish)
+    return curve
+
+
+def emitfx(position: Sequence[float], velocity: Sequence[float] | None = None,
+           count: int = 10, scale: float = 1.0, spread: float = 1.0,
+           chunk_type: str = 'rock', emit_type: str = 'chunks',
+           tendril_type: str = 'smoke') -> None:
+    """Emit particles; headless builds only count them."""
+    engine.counters['emitfx_calls'] += 1
+    engine.counters['particles'] += count
+
+
+class Collision:
+    """Info about the collision currently being handled."""
+
+    def __init__(self, opposingnode: Node, sourcenode: Node | None = None,
+                 position: Sequence[float] = (0.0, 0.0, 0.0)) -> None:
+        self.opposingnode = opposingnode
+        self.sourcenode = sourcenode if sourcenode is not None else NULL_NODE
+        self.position = position
+
+
+def getcollision() -> Collision:
+    """Return the collision currently being handled."""
+    if engine.collision is None:
+        raise NotFoundError('No collision in progress.')
+    return engine.collision
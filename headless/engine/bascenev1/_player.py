@@ -0,0 +1,86 @@
+"""Headless Player and Team."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Generic, TypeVar
+
+from bascenev1._messages import DeathType, DieMessage
+
+if TYPE_CHECKING:
+    from typing import Any, Sequence
+
+PlayerT = TypeVar('PlayerT', bound='Player')
+TeamT = TypeVar('TeamT', bound='Team')
+
+
+class Player(Generic[TeamT]):
+    """A player in an activity.
+
+    Subclasses don't call our __init__; the host fills us in through
+    postinit() like the real engine does.
+    """
+
+    actor: Any = None
+
+    def postinit(self, name: str, team: TeamT, color: Sequence[float],
+                 character: str = 'Spaz') -> None:
+        self._name = name
+        self._team = team
+        self._expired = False
+        self.actor = None
+        self.character = character
+        self.color = tuple(color)
+        self.highlight = tuple(c * 0.5 for c in color)
+        self.customdata: dict = {}
+
+    @property
+    def team(self) -> TeamT:
+        return self._team
+
+    def getname(self, full: bool = False, icon: bool = True) -> str:
+        return self._name
+
+    def exists(self) -> bool:
+        return not self._expired
+
+    def __bool__(self) -> bool:
+        return self.exists()
+
+    def is_alive(self) -> bool:
+        return self.actor is not None and self.actor.is_alive()
+
+    @property
+    def node(self) -> Any:
+        return None if self.actor is None else self.actor.node
+
+    def get_icon(self) -> dict[str, Any]:
+        from bascenev1._assets import gettexture
+        return {'texture': gettexture('neoSpazIcon'),
+                'tint_texture': gettexture('neoSpazIconColorMask'),
+                'tint_color': self.color,
+                'tint2_color': self.highlight}
+
+    def assigninput(self, inputtype: Any, call: Any) -> None:
+        pass
+
+    def resetinput(self) -> None:
+        pass
+
+    def leave(self) -> None:
+        """Called by the host when the player leaves the activity."""
+        if self.actor:
+            self.actor.handlemessage(DieMessage(how=DeathType.LEFT_GAME))
+        self.actor = None
+        self._expired = True
+
+
+class Team(Generic[PlayerT]):
+    """A team of players in an activity."""
+
+    def postinit(self, team_id: int, name: str,
+                 color: Sequence[float]) -> None:
+        self.id = team_id
+        self.name = name
+        self.color = tuple(color)
+        self.players: list[PlayerT] = []
+        self.customdata: dict = {}
@@ -0,0 +1 @@
+"""Headless stand-in for the bascenev1lib package."""
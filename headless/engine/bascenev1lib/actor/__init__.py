@@ -0,0 +1 @@
+"""Headless stand-ins for the standard actors."""
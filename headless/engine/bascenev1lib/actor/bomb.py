@@ -0,0 +1,104 @@
+"""Headless stand-in for bascenev1lib.actor.bomb."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import bascenev1 as bs
+
+if TYPE_CHECKING:
+    from typing import Any, Sequence
+
+
+class Blast(bs.Actor):
+    """An explosion; hits every spaz within its radius on the next step."""
+
+    def __init__(self, position: Sequence[float] = (0.0, 1.0, 0.0),
+                 velocity: Sequence[float] = (0.0, 0.0, 0.0),
+                 blast_radius: float = 2.0, blast_type: str = 'normal',
+                 source_player: bs.Player | None = None,
+                 hit_type: str = 'explosion',
+                 hit_subtype: str = 'normal') -> None:
+        super().__init__()
+        self.position = tuple(position)
+        self.velocity = tuple(velocity)
+        self.radius = blast_radius
+        self.blast_type = blast_type
+        self._source_player = source_player
+        self.hit_type = hit_type
+        self.hit_subtype = hit_subtype
+        self.node = bs.newnode('region', delegate=self, attrs={
+            'position': self.position,
+            'scale': (blast_radius, blast_radius, blast_radius)})
+        bs.timer(0.05, self.node.delete)
+        explosion = bs.newnode('explosion', attrs={
+            'position': self.position, 'radius': blast_radius})
+        bs.timer(1.0, explosion.delete)
+        light = bs.newnode('light', attrs={'position': self.position})
+        bs.animate(light, 'intensity', {0: 2.0, 0.2: 1.0, 1.0: 0.0})
+        bs.timer(1.0, light.delete)
+        bs.emitfx(position=self.position, velocity=self.velocity,
+                  count=30, chunk_type='spark')
+        bs.timer(0.0, bs.WeakCall(self._hit_spazzes))
+
+    def _hit_spazzes(self) -> None:
+        radius_sq = self.radius * self.radius
+        px, py, pz = self.position
+        for node in bs.getnodes():
+            if node.getnodetype() != 'spaz' or not node:
+                continue
+            x, y, z = node.position
+            dist_sq = (x - px) ** 2 + (y - py) ** 2 + (z - pz) ** 2
+            if dist_sq > radius_sq:
+                continue
+            direction = (x - px, y - py + 0.5, z - pz)
+            closeness = 1.0 - (dist_sq ** 0.5) / self.radius
+            node.getdelegate(bs.Actor).handlemessage(bs.HitMessage(
+                pos=self.position, velocity=self.velocity,
+                magnitude=2000.0 * closeness, velocity_magnitude=0.0,
+                radius=self.radius, source_player=self._source_player,
+                hit_type=self.hit_type, hit_subtype=self.hit_subtype,
+                force_direction=direction))
+
+    def exists(self) -> bool:
+        return bool(self.node)
+
+
+class Bomb(bs.Actor):
+    """A bomb; headless builds go off after a fixed fuse."""
+
+    def __init__(self, position: Sequence[float] = (0.0, 1.0, 0.0),
+                 velocity: Sequence[float] = (0.0, 0.0, 0.0),
+                 bomb_type: str = 'normal', blast_radius: float = 2.0,
+                 bomb_scale: float = 1.0,
+                 source_player: bs.Player | None = None,
+                 owner: bs.Node | None = None) -> None:
+        super().__init__()
+        self.bomb_type = bomb_type
+        self.blast_radius = blast_radius
+        self._source_player = source_player
+        self.owner = owner
+        self._exploded = False
+        self.node = bs.newnode('prop', delegate=self, attrs={
+            'position': position, 'velocity': velocity, 'body': 'sphere'})
+        bs.timer(2.0, bs.WeakCall(self.explode))
+
+    def exists(self) -> bool:
+        return bool(self.node)
+
+    def explode(self) -> None:
+        if self._exploded or not self.node:
+            return
+        self._exploded = True
+        Blast(position=self.node.position, velocity=self.node.velocity,
+              blast_radius=self.blast_radius, blast_type=self.bomb_type,
+              source_player=self._source_player,
+              hit_subtype=self.bomb_type).autoretain()
+        self.handlemessage(bs.DieMessage())
+
+    def handlemessage(self, msg: Any) -> Any:
+        if isinstance(msg, (bs.DieMessage, bs.OutOfBoundsMessage)):
+            if self.node:
+                self.node.delete()
+            return None
+        return super().handlemessage(msg)
@@ -0,0 +1,84 @@
+"""Headless stand-in for bascenev1lib.actor.playerspaz."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import bascenev1 as bs
+from bascenev1._engine import engine
+from bascenev1lib.actor.spaz import Spaz
+
+if TYPE_CHECKING:
+    from typing import Any, Sequence
+
+
+class PlayerSpaz(Spaz):
+    """A Spaz controlled by a player."""
+
+    def __init__(self, player: bs.Player,
+                 color: Sequence[float] = (1.0, 1.0, 1.0),
+                 highlight: Sequence[float] = (0.5, 0.5, 0.5),
+                 character: str = 'Spaz',
+                 powerups_expire: bool = True) -> None:
+        super().__init__(color=color, highlight=highlight,
+                         character=character, source_player=player,
+                         start_invincible=True,
+                         powerups_expire=powerups_expire)
+        self._player = player
+        self._connected_to_player: bs.Player | None = None
+        # What the player's inputs currently drive, for inspection.
+        self.controls: dict[str, bool] = {}
+
+    def getplayer(self, playertype: type,
+                  doraise: bool = False) -> bs.Player | None:
+        player = self._player
+        if isinstance(player, playertype) and player:
+            return player
+        if doraise:
+            raise bs.NotFoundError('Player not found.')
+        return None
+
+    def connect_controls_to_player(self, enable_jump: bool = True,
+                                   enable_punch: bool = True,
+                                   enable_pickup: bool = True,
+                                   enable_bomb: bool = True,
+                                   enable_run: bool = True,
+                                   enable_fly: bool = True) -> None:
+        engine.counters['control_connects'] += 1
+        self._connected_to_player = self._player
+        self.controls = {'jump': bool(enable_jump),
+                         'punch': bool(enable_punch),
+                         'pickup': bool(enable_pickup),
+                         'bomb': bool(enable_bomb),
+                         'run': bool(enable_run),
+                         'fly': bool(enable_fly)}
+
+    def disconnect_controls_from_player(self) -> None:
+        engine.counters['control_disconnects'] += 1
+        self._connected_to_player = None
+        self.controls = {}
+
+    def handlemessage(self, msg: Any) -> Any:
+        if isinstance(msg, bs.HitMessage):
+            source_player = msg.get_source_player(type(self._player))
+            if source_player:
+                self.last_player_attacked_by = source_player
+                self.last_attacked_time = bs.time()
+            return super().handlemessage(msg)
+        if isinstance(msg, bs.DieMessage):
+            if not self._dead:
+                was_attacked_recently = (
+                    self.last_player_attacked_by
+                    and bs.time() - self.last_attacked_time < 4.0)
+                left_game_cleanly = (msg.how is bs.DeathType.LEFT_GAME
+                                     and not was_attacked_recently)
+                killed = not (msg.immediate or left_game_cleanly)
+                killerplayer = (self.last_player_attacked_by
+                                if killed and was_attacked_recently else None)
+                activity = self.getactivity(doraise=False)
+                # Only report if both the player and the activity exist.
+                if killed and activity is not None and self._player:
+                    activity.handlemessage(bs.PlayerDiedMessage(
+                        self._player, killed, killerplayer, msg.how))
+            return super().handlemessage(msg)
+        return super().handlemessage(msg)
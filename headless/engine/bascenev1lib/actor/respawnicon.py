@@ -0,0 +1,15 @@
+"""Headless stand-in for bascenev1lib.actor.respawnicon."""
+
+from __future__ import annotations
+
+import bascenev1 as bs
+
+
+class RespawnIcon:
+    """Shows a countdown until a player respawns."""
+
+    def __init__(self, player: bs.Player, respawn_time: float) -> None:
+        self._image = bs.newnode('image', attrs={'opacity': 1.0})
+        self._text = bs.newnode('text', owner=self._image,
+                                attrs={'text': str(int(respawn_time))})
+        bs.timer(respawn_time, self._image.delete)
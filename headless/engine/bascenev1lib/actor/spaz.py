@@ -0,0 +1,235 @@
+"""Headless stand-in for bascenev1lib.actor.spaz."""
+
+from __future__ import annotations
+
+import random
+from typing import TYPE_CHECKING
+
+import bascenev1 as bs
+from bascenev1._engine import engine
+
+if TYPE_CHECKING:
+    from typing import Any, Sequence
+
+    from bascenev1lib.actor.bomb import Bomb
+
+
+class PickupMessage:
+    """We have touched something we can pick up."""
+
+
+class PunchHitMessage:
+    """Our punch has hit something."""
+
+
+class CurseExplodeMessage:
+    """We are cursed and should blow up now."""
+
+
+class BombDiedMessage:
+    """A bomb we dropped has died."""
+
+
+class SpazFactory:
+    """Shared sounds and other data for spazzes in an activity."""
+
+    _STORENAME = 'headless_spazfactory'
+
+    def __init__(self) -> None:
+        self.block_sound = bs.getsound('block')
+        self.punch_sound = bs.getsound('punch01')
+        self.punch_sound_strong = [bs.getsound('punchStrong01'),
+                                   bs.getsound('punchStrong02')]
+        self.punch_sound_weak = bs.getsound('punchWeak01')
+        self.swish_sound = bs.getsound('punchSwish')
+        self.shatter_sound = bs.getsound('shatter')
+
+    @classmethod
+    def get(cls) -> SpazFactory:
+        activity = bs.getactivity()
+        factory = activity.customdata.get(cls._STORENAME)
+        if factory is None:
+            factory = activity.customdata[cls._STORENAME] = cls()
+        return factory
+
+
+class Spaz(bs.Actor):
+    """A character; headless builds skip all physics."""
+
+    def __init__(self, color: Sequence[float] = (1.0, 1.0, 1.0),
+                 highlight: Sequence[float] = (0.5, 0.5, 0.5),
+                 character: str = 'Spaz', source_player: bs.Player | None = None,
+                 start_invincible: bool = True,
+                 can_accept_powerups: bool = True,
+                 powerups_expire: bool = False,
+                 demo_mode: bool = False) -> None:
+        super().__init__()
+        self.source_player = source_player
+        self.character = character
+        self.node = bs.newnode('spaz', delegate=self, attrs={
+            'color': color,
+            'highlight': highlight,
+            'invincible': start_invincible,
+            'source_player': source_player})
+        self.impact_scale = 1.0
+        self.hitpoints = 1000
+        self.hitpoints_max = 1000
+        self.bomb_type_default = 'normal'
+        self.bomb_type = self.bomb_type_default
+        self.blast_radius = 2.0
+        self.bomb_count = 1
+        self.default_bomb_count = 1
+        self.curse_time: float | None = 5.0
+        self.frozen = False
+        self.shattered = False
+        self.last_pickup_time_ms = 0
+        self.last_player_attacked_by: bs.Player | None = None
+        self.last_attacked_time = 0.0
+        self.held_count = 0
+        self.last_player_held_by: bs.Player | None = None
+        self._cursed = False
+        self._curse_timer: bs.Timer | None = None
+        self._dead = False
+        self._score_text: bs.Node | None = None
+        if start_invincible:
+            bs.timer(1.0, bs.WeakCall(self._end_invincibility))
+
+    def _end_invincibility(self) -> None:
+        if self.node:
+            self.node.invincible = False
+
+    def exists(self) -> bool:
+        return bool(self.node)
+
+    def is_alive(self) -> bool:
+        return not self._dead
+
+    def on_punched(self, damage: int) -> None:
+        pass
+
+    def on_pickup_press(self) -> None:
+        if not self.node:
+            return
+        self.node.pickup_pressed = True
+        self.last_pickup_time_ms = int(bs.time() * 1000.0)
+        self._turbo_filter_add_press('pickup')
+
+    def _turbo_filter_add_press(self, source: str) -> None:
+        pass
+
+    def drop_bomb(self) -> Bomb | None:
+        from bascenev1lib.actor.bomb import Bomb
+        if self.bomb_count <= 0 or self.frozen or not self.node:
+            return None
+        bomb = Bomb(position=self.node.position,
+                    velocity=self.node.velocity,
+                    bomb_type=self.bomb_type,
+                    blast_radius=self.blast_radius,
+                    source_player=self.source_player,
+                    owner=self.node).autoretain()
+        self.bomb_count -= 1
+        bomb.node.add_death_action(
+            bs.WeakCall(self.handlemessage, BombDiedMessage()))
+        return bomb
+
+    def curse(self) -> None:
+        if self._cursed:
+            return
+        self._cursed = True
+        if self.curse_time is not None and self.curse_time > 0:
+            self._curse_timer = bs.Timer(self.curse_time,
+                                         bs.WeakCall(self.curse_explode))
+
+    def curse_explode(self, source_player: bs.Player | None = None) -> None:
+        from bascenev1lib.actor.bomb import Blast
+        if self._cursed and self.node:
+            self.shatter(extreme=True)
+            self.handlemessage(bs.DieMessage())
+            Blast(position=self.node.position, blast_radius=3.0,
+                  source_player=source_player or self.source_player,
+                  hit_type='explosion', hit_subtype='curse').autoretain()
+            self._cursed = False
+
+    def shatter(self, extreme: bool = False) -> None:
+        if self.shattered or not self.node:
+            return
+        self.shattered = True
+        self.node.shattered = 2 if extreme else 1
+        engine.counters['shatters'] += 1
+
+    def set_score_text(self, text: str | bs.Lstr,
+                       color: Sequence[float] = (1.0, 1.0, 0.4),
+                       flash: bool = False) -> None:
+        if not self.node:
+            return
+        if not self._score_text:
+            self._score_text = bs.newnode('text', owner=self.node, attrs={
+                'text': text, 'in_world': True, 'color': color})
+        else:
+            self._score_text.text = text
+            self._score_text.color = color
+
+    def handlemessage(self, msg: Any) -> Any:
+        if isinstance(msg, bs.HitMessage):
+            return self._handle_hit(msg)
+        if isinstance(msg, bs.DieMessage):
+            if self._dead:
+                return None
+            self._dead = True
+            self.hitpoints = 0
+            if self.node:
+                if msg.immediate:
+                    self.node.delete()
+                else:
+                    self.node.hurt = 1.0
+                    self.node.dead = True
+                    bs.timer(2.0, self.node.delete)
+            return None
+        if isinstance(msg, bs.OutOfBoundsMessage):
+            self.handlemessage(bs.DieMessage(how=bs.DeathType.FALL))
+            return None
+        if isinstance(msg, bs.StandMessage):
+            if self.node:
+                self.node.handlemessage('stand', msg.position[0],
+                                        msg.position[1], msg.position[2],
+                                        msg.angle)
+            return None
+        if isinstance(msg, PickupMessage):
+            if not self.node:
+                return None
+            try:
+                collision = bs.getcollision()
+                opposingnode = collision.opposingnode
+            except bs.NotFoundError:
+                return True
+            if opposingnode:
+                self.node.hold_node = opposingnode
+            return True
+        if isinstance(msg, BombDiedMessage):
+            self.bomb_count += 1
+            return None
+        return super().handlemessage(msg)
+
+    def _handle_hit(self, msg: bs.HitMessage) -> Any:
+        if not self.node or self._dead:
+            return None
+        if self.node.invincible:
+            return True
+        mag = msg.magnitude * self.impact_scale
+        velocity_mag = msg.velocity_magnitude * self.impact_scale
+        self.node.handlemessage(
+            'impulse', msg.pos[0], msg.pos[1], msg.pos[2],
+            msg.velocity[0], msg.velocity[1], msg.velocity[2], mag,
+            velocity_mag, msg.radius, 0, msg.force_direction[0],
+            msg.force_direction[1], msg.force_direction[2])
+        damage = int(self.node.damage)
+        if msg.hit_type == 'punch':
+            self.on_punched(damage)
+        self.hitpoints -= damage
+        if self.hitpoints <= 0:
+            self.handlemessage(bs.DieMessage(how=bs.DeathType.IMPACT))
+        return True
+
+    @staticmethod
+    def random_angle() -> float:
+        return random.uniform(0, 360)
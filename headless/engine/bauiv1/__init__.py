@@ -0,0 +1,5 @@
+"""Headless stand-in for the bauiv1 module."""
+
+from babase import SpecialChar, charstr, Lstr
+
+__all__ = ['SpecialChar', 'charstr', 'Lstr']
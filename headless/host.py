@@ -0,0 +1,142 @@
+"""Drives a game activity on the headless engine."""
+
+from __future__ import annotations
+
+import random
+from typing import TYPE_CHECKING
+
+import bascenev1 as bs
+from bascenev1._engine import engine
+from bascenev1._nodes import Collision
+from bascenev1lib.actor.spaz import PickupMessage
+
+if TYPE_CHECKING:
+    from typing import Any
+
+_COLORS = [(1.0, 0.15, 0.15), (0.2, 1.0, 0.2), (0.1, 0.1, 1.0),
+           (0.2, 1.0, 1.0), (0.5, 0.25, 1.0), (1.0, 1.0, 0.0),
+           (1.0, 0.5, 0.0), (1.0, 0.3, 0.5), (0.1, 0.1, 0.5),
+           (0.4, 0.2, 0.1), (0.45, 0.55, 0.45), (0.4, 0.4, 0.4)]
+
+
+class Host:
+    """Runs one activity with a number of players on the virtual clock.
+
+    Creating a host resets the engine, so only one host is live at a time.
+    """
+
+    def __init__(self, activity_type: type[bs.GameActivity],
+                 settings: dict | None = None, players: int = 2,
+                 seed: int | None = None,
+                 session_type: type[bs.Session] = bs.FreeForAllSession
+                 ) -> None:
+        engine.reset()
+        if seed is not None:
+            random.seed(seed)
+        settings = dict(settings or {})
+        for setting in activity_type.get_available_settings(session_type):
+            settings.setdefault(setting.name, setting.default)
+        self.settings = settings
+        # The real engine runs the constructor in the new activity's context, so assets can be loaded there.
+        self.activity = activity_type.__new__(activity_type)
+        with engine.context(self.activity):
+            self.activity.__init__(settings)
+        self.activity.session = session_type()
+        with engine.context(self.activity):
+            for index in range(players):
+                self.add_player(f'Player {index + 1}')
+
+    @property
+    def time(self) -> float:
+        return engine.time
+
+    def add_player(self, name: str) -> bs.Player:
+        activity = self.activity
+        color = _COLORS[len(activity.players) % len(_COLORS)]
+        team = activity.teamtype()
+        team.postinit(len(activity.teams), name, color)
+        activity.teams.append(team)
+        player = activity.playertype()
+        player.postinit(name, team, color)
+        team.players.append(player)
+        activity.players.append(player)
+        with engine.context(activity):
+            activity.on_player_join(player)
+        return player
+
+    def begin(self) -> None:
+        activity = self.activity
+        activity._has_begun = True  # pylint: disable=protected-access
+        with engine.context(activity):
+            activity.on_begin()
+
+    def run(self, seconds: float) -> None:
+        """Let the game play out for a while of virtual time."""
+        engine.run_until(engine.time + seconds)
+
+    def run_until(self, time: float) -> None:
+        engine.run_until(time)
+
+    def run_until_ended(self, limit: float = 3600.0) -> bool:
+        """Run until the activity ends or the time limit is hit."""
+        end = engine.time + limit
+        while not self.activity.has_ended():
+            due = engine.next_due()
+            if due is None or due > end:
+                break
+            engine.run_until(due)
+        return self.activity.has_ended()
+
+    def remove_player(self, player: bs.Player) -> None:
+        """Have a player leave, in the same order the real engine does."""
+        activity = self.activity
+        with engine.context(activity):
+            activity.players.remove(player)
+            player.team.players.remove(player)
+            activity.on_player_leave(player)
+            team = player.team
+            player.leave()
+            # Free-for-all sessions drop a team along with its only player.
+            if (isinstance(activity.session, bs.FreeForAllSession)
+                    and not team.players):
+                activity.teams.remove(team)
+
+    def send(self, actor: Any, msg: Any) -> Any:
+        """Deliver a message to an actor in the activity's context."""
+        with engine.context(self.activity):
+            return actor.handlemessage(msg)
+
+    def punch(self, attacker: bs.Player, victim: bs.Player,
+              magnitude: float = 600.0) -> Any:
+        return self.send(victim.actor, bs.HitMessage(
+            pos=victim.actor.node.position, velocity=(1.0, 0.0, 0.0),
+            magnitude=magnitude, velocity_magnitude=magnitude * 0.5,
+            radius=0.4, source_player=attacker, hit_type='punch',
+            force_direction=(1.0, 0.0, 0.0)))
+
+    def bomb_hit(self, attacker: bs.Player, victim: bs.Player,
+                 magnitude: float = 1500.0) -> Any:
+        return self.send(victim.actor, bs.HitMessage(
+            pos=victim.actor.node.position, velocity=(0.0, 1.0, 0.0),
+            magnitude=magnitude, radius=2.0, source_player=attacker,
+            hit_type='explosion', hit_subtype='normal',
+            force_direction=(0.0, 1.0, 0.0)))
+
+    def grab(self, grabber: bs.Player, victim: bs.Player) -> Any:
+        # The grabbing spaz is told it touched something it can pick up.
+        engine.collision = Collision(opposingnode=victim.actor.node,
+                                     sourcenode=grabber.actor.node)
+        try:
+            return self.send(grabber.actor, PickupMessage())
+        finally:
+            engine.collision = None
+
+    def fall(self, player: bs.Player) -> Any:
+        return self.send(player.actor, bs.OutOfBoundsMessage())
+
+    def snapshot(self) -> dict[str, int]:
+        """Counts of live nodes and timers plus everything counted so far."""
+        stats = dict(engine.counters)
+        stats['live_nodes'] = len(engine.nodes)
+        stats['live_timers'] = engine.live_timers()
+        return stats
@@ -22,22 +22,50 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, override
 
 # Define only what we need and nothing more
+# The actor modules from bascenev1lib are imported later, see _load_actors.
 import babase
 import bascenev1 as ba
-from bascenev1lib.actor.spaz import SpazFactory
-from bascenev1lib.actor.spaz import PickupMessage
-from bascenev1lib.actor.spaz import BombDiedMessage
-from bascenev1lib.actor.playerspaz import PlayerSpaz
-from bascenev1lib.actor.bomb import Bomb
-from bascenev1lib.actor.bomb import Blast
+from collections import deque
+from datetime import datetime
 from enum import Enum
+from typing import NamedTuple
+import atexit
+import itertools
+import json
+import logging
+import math
+import os
+import queue
 import random
+import struct
+import sys
+import threading
+import weakref
+
+# Turn this on to time every callback the engine makes into this game mode.
+# The timings get logged when the game ends. Needs perf_hooks.py next to this file.
+PROFILE_CALLBACKS = False
+# Set this to a number of milliseconds to get a warning with stack samples whenever one of our callbacks
+# takes longer than that. 0 turns it off. Also needs perf_hooks.py.
+WATCHDOG_BUDGET_MS = 0.0
 
 IMPACT_BOMB_RADIUS_SCALE = 0.7
 MARKED_KNOCKBACK_SCALE = 0.8
+# When this is on, players who fall off the map keep their character.
+# Instead of dying and getting a brand new spaz, the same one gets put back on a spawn point.
+# Falling is a core mechanic here, so this saves us a lot of actor and node creation after big blasts.
+RECYCLE_SPAZ_ON_FALL = False
+# When several players get eliminated at once, their explosions go off this many seconds apart
+# instead of all in the same frame. They run on the TimerWheel, so keep this a multiple of 0.1.
+ELIMINATION_EFFECT_STAGGER = 0.1
 
 if TYPE_CHECKING:
-    pass
+    from typing import Any, Callable, Iterator, Sequence
+    from bascenev1lib.actor.spaz import SpazFactory
+    from bascenev1lib.actor.spaz import PickupMessage
+    from bascenev1lib.actor.playerspaz import PlayerSpaz
+    from bascenev1lib.actor.bomb import Bomb
+    from bascenev1lib.actor.bomb import Blast
 
 # Let's define stun times for falling.
 # First element is stun for the first fall, second element is stun for the second fall and so on.
@@ -52,6 +80,12 @@ FALL_PENALTIES = [1.5,
                   9.0,
                   10.0]
 
+# Stun timers count down in ticks of 0.1 seconds.
+# Every countdown string we could ever show is made once up here, so ticking doesn't build new strings.
+STUN_TICKS_PER_SECOND = 10
+STUN_TICK_STRINGS = tuple(sys.intern(str(ticks / STUN_TICKS_PER_SECOND))
+                          for ticks in range(round(max(FALL_PENALTIES) * STUN_TICKS_PER_SECOND) + 1))
+
 RED_COLOR = (1.0, 0.2, 0.2)
 YELLOW_COLOR = (1.0, 1.0, 0.2)
 
@@ -74,6 +108,563 @@ class PlayerState(Enum):
     # The time it takes to go back to the REGULAR state gets more severe the more times the player dies by falling off the map.
     STUNNED = 3
 
+# Hot Potato runs a lot of countdowns: stun timers, grab cooldowns, the elimination tick and so on.
+# Giving each one its own ba.Timer means the engine juggles one timer per stunned player.
+# Instead, all of them register here and one repeating ba.Timer drives the whole bunch.
+# Countdowns are rounded to our resolution (0.1 seconds), which every delay in this gamemode is a multiple of.
+class TimerWheel:
+    """Runs many countdowns off a single engine timer."""
+
+    def __init__(self, resolution: float = 0.1):
+        self._resolution = resolution
+        self._tick = 0
+        # Pending countdowns, bucketed by the tick they're due on.
+        # We only keep weak references, so just like a ba.Timer, a countdown is cancelled once nobody holds on to it.
+        self._slots: dict[int, list[weakref.ref[WheelTimer]]] = {}
+        self._pending = 0
+        self._engine_timer: ba.Timer | None = None
+        # When the engine timer last went off, so we know how far into the current tick we are.
+        self._tick_time = 0.0
+
+    # Works like ba.Timer: keep the returned object around for as long as you want the countdown to run.
+    def timer(self, time: float, call: Callable[[], Any], repeat: bool = False) -> WheelTimer:
+        ticks = max(1, round(time / self._resolution))
+        wheel_timer = WheelTimer(call, ticks if repeat else 0)
+        due_tick = self._tick + ticks
+        # If we're partway through a tick, the next one comes early, so wait one more to never go off too soon.
+        if self._engine_timer is not None and ba.time() - self._tick_time > self._resolution * 0.01:
+            due_tick += 1
+        self._insert(wheel_timer, due_tick)
+        return wheel_timer
+
+    def _insert(self, wheel_timer: WheelTimer, due_tick: int) -> None:
+        slot = self._slots.get(due_tick)
+        if slot is None:
+            slot = self._slots[due_tick] = []
+        slot.append(weakref.ref(wheel_timer))
+        self._pending += 1
+        # We only need the engine timer while there's something to count down.
+        if self._engine_timer is None:
+            self._engine_timer = ba.Timer(self._resolution, ba.WeakCall(self._advance), repeat=True)
+            self._tick_time = ba.time()
+
+    def _advance(self) -> None:
+        self._tick += 1
+        self._tick_time = ba.time()
+        slot = self._slots.pop(self._tick, None)
+        if slot is not None:
+            self._pending -= len(slot)
+            for ref in slot:
+                wheel_timer = ref()
+                # Skip countdowns that got cancelled, including ones cancelled by an earlier call in this very tick.
+                if wheel_timer is None:
+                    continue
+                if wheel_timer.interval:
+                    self._insert(wheel_timer, self._tick + wheel_timer.interval)
+                # With separate ba.Timers one failing countdown never stopped the others, so it shouldn't here either.
+                try:
+                    wheel_timer.call()
+                except Exception:
+                    babase.print_exception(f'Error in Hot Potato countdown {wheel_timer.call!r}.')
+        if self._pending == 0:
+            self._engine_timer = None
+
+
+class WheelTimer:
+    """A countdown registered with a TimerWheel."""
+
+    __slots__ = ('call', 'interval', '__weakref__')
+
+    def __init__(self, call: Callable[[], Any], interval: int):
+        self.call = call
+        # Ticks between calls for repeating countdowns, 0 for one-shot ones.
+        self.interval = interval
+
+
+# A set of players we can also pick from by position, which is what lets us draw random players without making lists.
+# Removing swaps the last player into the hole, so the order isn't the join order, but it's still the same every run.
+class PlayerIndex:
+    """A set of players that supports O(1) add, remove and random access."""
+
+    __slots__ = ('_players', '_positions')
+
+    def __init__(self) -> None:
+        self._players: list[Player] = []
+        self._positions: dict[Player, int] = {}
+
+    def add(self, player: Player) -> None:
+        if player in self._positions:
+            return
+        self._positions[player] = len(self._players)
+        self._players.append(player)
+
+    def discard(self, player: Player) -> None:
+        position = self._positions.pop(player, None)
+        if position is None:
+            return
+        last = self._players.pop()
+        if last is not player:
+            self._players[position] = last
+            self._positions[last] = position
+
+    def __contains__(self, player: object) -> bool:
+        return player in self._positions
+
+    def __getitem__(self, position: int) -> Player:
+        return self._players[position]
+
+    def __iter__(self) -> Iterator[Player]:
+        return iter(self._players)
+
+    def __len__(self) -> int:
+        return len(self._players)
+
+
+# How many players get marked at the start of a round.
+# One mark for every MARK_PLAYERS_PER_MARK alive players on top of the first one,
+# but someone always has to be left unmarked.
+MARK_PLAYERS_PER_MARK = 6
+
+
+def mark_count(alive: int) -> int:
+    return max(1, min(1 + alive // MARK_PLAYERS_PER_MARK, alive - 1))
+
+
+# How long we get stunned for when we fall, depending on how many times we fell before.
+def stun_time_for_falls(fall_times: int, penalties: Sequence[float] = FALL_PENALTIES) -> float:
+    if fall_times < len(penalties):
+        return penalties[fall_times]
+    return penalties[len(penalties) - 1]
+
+
+# Marked players can pass the mark to anyone who isn't marked already.
+def can_pass_mark(marked_state: PlayerState, hit_state: PlayerState) -> bool:
+    return marked_state == PlayerState.MARKED and hit_state != PlayerState.MARKED
+
+
+# Seconds from the start of the game until the first mark, then between eliminations and the next mark.
+# Epic mode uses EPIC_MARK_DELAY for both.
+FIRST_MARK_DELAY = 5.2
+NEXT_MARK_DELAY = 4.0
+EPIC_MARK_DELAY = 2.0
+# Seconds between the last elimination and the game ending.
+END_GAME_DELAY = 1.25
+
+
+# Every round gets recorded to a small binary file, so we can look back at what happened in it.
+RECORD_ROUNDS = True
+# The files end up in this folder inside the user's mods directory.
+ROUND_LOG_DIRECTORY = 'hot_potato_logs'
+# We only keep this many of the newest files in there, older ones get deleted. 0 keeps everything.
+ROUND_LOG_KEEP = 200
+# How many events we keep in memory before moving them out of the way.
+ROUND_LOG_CAPACITY = 1024
+# How many of those full buffers a single round can fill. Anything past that doesn't get recorded.
+ROUND_LOG_MAX_BUFFERS = 64
+# How long we wait for unsaved round logs when the game shuts down, in seconds.
+ROUND_LOG_EXIT_TIMEOUT = 5.0
+
+
+# All the things we write down during a round.
+class RoundEvent(Enum):
+    # Stores the amount of players instead of a player id.
+    ROUND_START = 0
+    ROUND_END = 1
+    # A player changed state. The record also has the new state.
+    STATE = 2
+    # The mark got passed from one player to another.
+    PASS = 3
+    # A player was picked to be marked at the start of a mark.
+    NEW_MARK = 4
+    ELIMINATED = 5
+    LEFT = 6
+    FALL = 7
+
+
+# Every event is one of these: time, event, state, player and other player.
+# Events without a state or a second player store -1 there.
+ROUND_LOG_RECORD = struct.Struct('<dbbhh')
+# The start of every file: magic, version, record size, player table size and record count.
+ROUND_LOG_HEADER = struct.Struct('<4sHHII')
+ROUND_LOG_MAGIC = b'HPRL'
+ROUND_LOG_VERSION = 1
+
+
+# What read_round_log gives back.
+class RoundLog(NamedTuple):
+    players: list[str]
+    settings: dict[str, Any]
+    events: list[tuple[float, RoundEvent, PlayerState | None, int, int]]
+
+
+# Writes finished round logs to disk on its own thread, so the game never waits for the disk.
+class RoundLogWriter:
+    """Background thread that saves finished round logs."""
+
+    def __init__(self) -> None:
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, path: str, table: bytes, chunks: list[bytes]) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='HotPotatoRoundLog', daemon=True)
+                self._thread.start()
+        self._queue.put((path, table, chunks))
+
+    # Wait until everything we were given is on disk, or until timeout seconds have passed.
+    # The game only calls this on shutdown, so the last round before a restart isn't lost.
+    def flush(self, timeout: float | None = None) -> None:
+        with self._lock:
+            if self._thread is None:
+                return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            if isinstance(job, threading.Event):
+                job.set()
+                continue
+            path, table, chunks = job
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'wb') as outfile:
+                    outfile.write(ROUND_LOG_HEADER.pack(ROUND_LOG_MAGIC, ROUND_LOG_VERSION, ROUND_LOG_RECORD.size,
+                                                        len(table), sum(len(chunk) for chunk in chunks)
+                                                        // ROUND_LOG_RECORD.size))
+                    outfile.write(table)
+                    for chunk in chunks:
+                        outfile.write(chunk)
+                if ROUND_LOG_KEEP:
+                    self._prune(os.path.dirname(path))
+            except OSError:
+                logging.exception('Hot Potato: could not save round log to %s', path)
+
+    # Delete the oldest round logs until only ROUND_LOG_KEEP are left.
+    @staticmethod
+    def _prune(directory: str) -> None:
+        paths = [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.hprl')]
+        if len(paths) <= ROUND_LOG_KEEP:
+            return
+        paths.sort(key=lambda path: (os.path.getmtime(path), path))
+        for path in paths[:len(paths) - ROUND_LOG_KEEP]:
+            os.remove(path)
+
+
+round_log_writer = RoundLogWriter()
+# The writer is a daemon thread, so without this, a round that just ended could be lost when the game quits.
+atexit.register(round_log_writer.flush, ROUND_LOG_EXIT_TIMEOUT)
+_round_log_ids = itertools.count()
+
+
+# Records what happens in a round into a buffer we made up front.
+# Recording an event is just packing a few numbers, so it costs next to nothing.
+# When the buffer fills up, we set the full buffer aside and start over from the beginning.
+# This isn't a ring buffer that overwrites the oldest events: a log missing its start can't be replayed.
+# Instead we stop recording once a round has filled ROUND_LOG_MAX_BUFFERS buffers, which caps the memory a round can use.
+# Once the round ends, everything goes to the writer thread.
+class RoundLogger:
+    """Collects the events of one Hot Potato round."""
+
+    def __init__(self, settings: dict, capacity: int = ROUND_LOG_CAPACITY):
+        self._buffer = bytearray(ROUND_LOG_RECORD.size * capacity)
+        self._capacity = capacity
+        self._count = 0
+        self._full_buffers: list[bytes] = []
+        self._players: list[str] = []
+        self._settings = dict(settings)
+        self.closed = False
+        # Whether we ran out of room and stopped recording.
+        self.truncated = False
+
+    # Players get an id in join order. Events refer to players by that id.
+    def add_player(self, name: str) -> int:
+        self._players.append(name)
+        return len(self._players) - 1
+
+    def record(self, event: RoundEvent, player: int = -1, other: int = -1,
+               state: PlayerState | None = None) -> None:
+        if self.closed or self.truncated:
+            return
+        if self._count == self._capacity:
+            if len(self._full_buffers) >= ROUND_LOG_MAX_BUFFERS:
+                self.truncated = True
+                logging.warning('Hot Potato: round log is full, the rest of this round won\'t be recorded.')
+                return
+            self._full_buffers.append(bytes(self._buffer))
+            self._count = 0
+        ROUND_LOG_RECORD.pack_into(self._buffer, self._count * ROUND_LOG_RECORD.size,
+                                   ba.time(), event.value, -1 if state is None else state.value, player, other)
+        self._count += 1
+
+    # Everything recorded so far, as packed records.
+    def records(self) -> list[bytes]:
+        return self._full_buffers + [bytes(self._buffer[:self._count * ROUND_LOG_RECORD.size])]
+
+    # Everything recorded so far, unpacked the same way read_round_log does it.
+    def events(self) -> list[tuple[float, RoundEvent, PlayerState | None, int, int]]:
+        return unpack_round_events(b''.join(self.records()))
+
+    # The round is over. Hand everything over to be saved.
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        chunks = self.records()
+        table = json.dumps({'players': self._players, 'settings': self._settings}).encode()
+        path = os.path.join(babase.app.env.python_directory_user, ROUND_LOG_DIRECTORY,
+                            f'{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}-{next(_round_log_ids)}.hprl')
+        round_log_writer.submit(path, table, chunks)
+
+
+# Read a round log saved by RoundLogger.
+def read_round_log(path: str) -> RoundLog:
+    with open(path, 'rb') as infile:
+        data = infile.read()
+    magic, version, record_size, table_size, count = ROUND_LOG_HEADER.unpack_from(data)
+    if magic != ROUND_LOG_MAGIC or version != ROUND_LOG_VERSION or record_size != ROUND_LOG_RECORD.size:
+        raise ValueError(f'{path} is not a Hot Potato round log we can read')
+    offset = ROUND_LOG_HEADER.size
+    table = json.loads(data[offset:offset + table_size])
+    offset += table_size
+    return RoundLog(table['players'], table['settings'],
+                    unpack_round_events(data[offset:offset + count * record_size]))
+
+
+def unpack_round_events(data: bytes) -> list[tuple[float, RoundEvent, PlayerState | None, int, int]]:
+    return [(time, RoundEvent(event), None if state < 0 else PlayerState(state), player, other)
+            for time, event, state, player, other in ROUND_LOG_RECORD.iter_unpack(data)]
+
+
+# Every node attribute change gets sent over the network to all clients.
+# State changes tend to write the same values over and over, so we remember what we last wrote and skip repeats.
+class NodeWriter:
+    """Writes node attributes, skipping values the node already has."""
+
+    __slots__ = ('node', '_values')
+
+    def __init__(self, node: ba.Node, attrs: dict | None = None):
+        self.node = node
+        # The values we know the node has. Usually the attrs the node was created with.
+        self._values: dict[str, Any] = dict(attrs) if attrs else {}
+
+    def set(self, attr: str, value: Any) -> None:
+        values = self._values
+        if attr in values and values[attr] == value:
+            return
+        values[attr] = value
+        setattr(self.node, attr, value)
+
+    # Write a whole bundle of attributes in one go.
+    def apply(self, attrs: dict[str, Any]) -> None:
+        for attr, value in attrs.items():
+            self.set(attr, value)
+
+    # Call this after animating an attribute, since we don't know its value anymore.
+    def forget(self, attr: str) -> None:
+        self._values.pop(attr, None)
+
+
+# Particles and lights are the first thing to bog down a weak server when everyone is fighting at once.
+# Here's how much we're willing to spend on them every second. The more players, the more we allow.
+EFFECTS_BASE_PARTICLES = 300
+EFFECTS_PARTICLES_PER_PLAYER = 150
+EFFECTS_BASE_LIGHTS = 10
+EFFECTS_LIGHTS_PER_PLAYER = 6
+
+
+# Keeps track of the particles and cosmetic lights we spawned over the last second.
+# Once we go over budget, particle counts get cut down and cosmetic lights get skipped.
+# Only purely visual stuff goes through here. Anything that affects gameplay is never skipped.
+class EffectsGovernor:
+    """Limits how many particles and cosmetic lights an activity spawns per second."""
+
+    window = 1.0
+
+    def __init__(self, activity: ba.Activity):
+        self._activity = weakref.ref(activity)
+        # What we spent and when, oldest first. Entries are (time, particles, lights).
+        self._spent: deque[tuple[float, int, int]] = deque()
+        self._particles = 0
+        self._lights = 0
+
+    # Forget anything we spent more than a second ago.
+    def _expire(self, now: float) -> None:
+        spent = self._spent
+        cutoff = now - self.window
+        while spent and spent[0][0] <= cutoff:
+            _, particles, lights = spent.popleft()
+            self._particles -= particles
+            self._lights -= lights
+
+    def _player_count(self) -> int:
+        activity = self._activity()
+        return len(activity.players) if activity is not None else 0
+
+    def _spend(self, now: float, particles: int, lights: int) -> None:
+        self._spent.append((now, particles, lights))
+        self._particles += particles
+        self._lights += lights
+
+    # Same as ba.emitfx, but the particle count gets cut down to whatever is left of our budget.
+    def emitfx(self, count: int, **kwargs: Any) -> None:
+        now = ba.time()
+        self._expire(now)
+        budget = EFFECTS_BASE_PARTICLES + EFFECTS_PARTICLES_PER_PLAYER * self._player_count()
+        count = min(count, budget - self._particles)
+        if count <= 0:
+            return
+        self._spend(now, count, 0)
+        ba.emitfx(count=count, **kwargs)
+
+    # Ask before creating a light that's only there to look nice. Returns False if we're over budget.
+    def allow_light(self) -> bool:
+        now = ba.time()
+        self._expire(now)
+        budget = EFFECTS_BASE_LIGHTS + EFFECTS_LIGHTS_PER_PLAYER * self._player_count()
+        if self._lights >= budget:
+            return False
+        self._spend(now, 0, 1)
+        return True
+
+
+# When a big explosion knocks half the lobby off the map, spawning everyone back one by one means a separate
+# timer, spawn point search and spawn for every single one of them.
+# Instead, respawns due close together get collected into a wave and spawned in one go,
+# with spawn points picked once for the whole wave.
+# Waves go off on multiples of RESPAWN_WAVE_WINDOW, and every respawn joins the first wave that isn't due before it is.
+# So nobody comes back early, and nobody waits more than one window longer than they would have.
+RESPAWN_WAVE_WINDOW = 0.25
+
+
+class RespawnWave:
+    __slots__ = ('time', 'players')
+
+    def __init__(self, time: float):
+        self.time = time
+        self.players: list[Player] = []
+
+
+class RespawnWaves:
+    """Spawns players in waves, using spawn(player, position) for each of them."""
+
+    def __init__(self, activity: ba.Activity, spawn: Callable[[Any, Sequence[float]], Any],
+                 window: float = RESPAWN_WAVE_WINDOW):
+        # The activity keeps us around, so we only hold on to it (and its spawn method) weakly.
+        # Otherwise it'd stay alive in a cycle until the garbage collector got around to it.
+        self._activity = weakref.ref(activity)
+        self._spawn = weakref.WeakMethod(spawn)
+        self.window = window
+        # Waiting waves, keyed by the window they go off at the end of.
+        self._waves: dict[int, RespawnWave] = {}
+
+    # Spawn a player in delay seconds, or up to one window after that.
+    def schedule(self, player: Player, delay: float = 0.0) -> None:
+        now = ba.time()
+        # The tiny nudge keeps float noise from pushing a due time that's right on a boundary into the next window.
+        index = math.ceil((now + delay) / self.window - 1e-6)
+        wave = self._waves.get(index)
+        if wave is None:
+            wave = self._waves[index] = RespawnWave(index * self.window)
+            ba.timer(max(0.0, wave.time - now), ba.WeakCall(self._release, index))
+        if player not in wave.players:
+            wave.players.append(player)
+
+    def pending(self, player: Player) -> bool:
+        return any(player in wave.players for wave in self._waves.values())
+
+    def _release(self, index: int) -> None:
+        wave = self._waves.pop(index)
+        activity = self._activity()
+        spawn = self._spawn()
+        players = [player for player in wave.players if player.exists()]
+        if not players or activity is None or spawn is None or activity.has_ended():
+            return
+        for player, position in zip(players, pick_spawn_positions(activity, len(players))):
+            spawn(player, position)
+
+
+# Spawn positions for a whole wave at once, each as far from everybody alive as we can manage.
+# This does for a whole wave what map.get_ffa_start_position() does for a single player.
+def pick_spawn_positions(activity: ba.Activity, count: int) -> list[tuple[float, float, float]]:
+    points = activity.map.ffa_spawn_points
+    taken = [player.node.position for player in activity.players if player.is_alive()]
+    if taken:
+        # Emptiest spawn points first. We only measure once, so a big wave gets spread over all of them.
+        points = sorted(points, reverse=True, key=lambda point: min(
+            (point[0] - other[0]) ** 2 + (point[2] - other[2]) ** 2 for other in taken))
+    else:
+        points = random.sample(points, len(points))
+    positions = []
+    for i in range(count):
+        point = points[i % len(points)]
+        x_range = point[3] if point[3] else 0.5
+        z_range = point[5] if point[5] else 0.5
+        positions.append((point[0] + random.uniform(-x_range, x_range),
+                          point[1],
+                          point[2] + random.uniform(-z_range, z_range)))
+    return positions
+
+
+# Here's what every part of an Icon looks like in each state, worked out once instead of on every state change.
+# Icon.set_marked_icon applies these with NodeWriters.
+ICON_STATE_ATTRS = {
+    # Regular players get no icons or status text
+    PlayerState.REGULAR: {
+        'marked_icon': {'text': '', 'opacity': 0.0},
+        'marked_text': {'text': ''},
+        'name_text': {'flatness': 1.0},
+        'portrait': {'color': (1.0, 1.0, 1.0)},
+    },
+    # Marked players get ALL of the attention - red portrait, red text and icon overlaying the portrait
+    PlayerState.MARKED: {
+        'marked_icon': {'text': babase.charstr(babase.SpecialChar.HAL), 'opacity': 1.0},
+        'marked_text': {'text': 'Marked!', 'color': (1.0, 0.0, 0.0)},
+        'name_text': {'flatness': 0.0},
+        'portrait': {'color': (1.0, 0.2, 0.2)},
+    },
+    # Stunned players are just as important - yellow portrait, yellow text and moon icon.
+    PlayerState.STUNNED: {
+        'marked_icon': {'text': babase.charstr(babase.SpecialChar.MOON), 'opacity': 1.0},
+        'marked_text': {'text': 'Stunned!', 'color': (1.0, 1.0, 0.0)},
+        'name_text': {},
+        'portrait': {'color': (0.75, 0.75, 0.0)},
+    },
+    # Eliminated players get special treatment.
+    # We make the portrait semi-transparent, while adding some visual flair with an fading skull icon and text.
+    # The fading is animated, so it's not part of this.
+    PlayerState.ELIMINATED: {
+        'marked_icon': {'text': babase.charstr(babase.SpecialChar.SKULL)},
+        'marked_text': {'text': 'You\'re Out!', 'color': (0.5, 0.5, 0.5)},
+        'name_text': {'opacity': 0.2},
+        'portrait': {'color': (0.7, 0.3, 0.3), 'opacity': 0.2},
+    },
+}
+
+# Where the status icon sits relative to the portrait. Each symbol needs a slightly different nudge.
+ICON_STATE_OFFSETS = {
+    PlayerState.MARKED: (-1, -13),
+    PlayerState.STUNNED: (-2, -12),
+    PlayerState.ELIMINATED: (-2, -12),
+}
+
+# The light and timer text over a MARKED or STUNNED spaz.
+MARKED_VISUAL_ATTRS = {
+    PlayerState.MARKED: {
+        'light': {'intensity': 1.5, 'color': (1.0, 0.0, 0.0)},
+        'text': {'color': (RED_COLOR[0], RED_COLOR[1], RED_COLOR[2], 1.0)},
+    },
+    PlayerState.STUNNED: {
+        'light': {'intensity': 0.5, 'color': (1.0, 1.0, 0.0)},
+        'text': {'color': (YELLOW_COLOR[0], YELLOW_COLOR[1], YELLOW_COLOR[2], 1.0)},
+    },
+}
+
+
 # To make the game easier to parse, I added Elimination style icons to the bottom of the screen.
 # Here's the behavior of each icon.
 
@@ -94,7 +685,8 @@ class Icon(ba.Actor):
         self._player = player
         self._name_scale = name_scale
 
-        self._outline_tex = ba.gettexture('characterIconMask')
+        # Every icon uses the same outline, so the game looks it up once and we borrow it.
+        self._outline_tex = self.activity.icon_outline_texture
 
         # Character portrait
         icon = player.get_icon()
@@ -159,47 +751,33 @@ class Icon(ba.Actor):
                 'h_attach': 'center',
                 'v_attach': 'bottom'
             })
+        # Writers for each part of the icon, so changing states only sends what actually changed.
+        self._portrait_writer = NodeWriter(self.node, {'opacity': 1.0})
+        self._name_text_writer = NodeWriter(self._name_text, {'flatness': 1.0})
+        self._marked_text_writer = NodeWriter(self._marked_text, {'text': '', 'color': (1, 0.1, 0.0)})
+        self._marked_icon_writer = NodeWriter(self._marked_icon, {'text': babase.charstr(babase.SpecialChar.HAL),
+                                                                  'opacity': 0.0})
         self.set_marked_icon(player.state)
         self.set_position_and_scale(position, scale)
 
     # Change our icon's appearance depending on the player state.
     def set_marked_icon(self, type: PlayerState) -> None:
-        pos = self.node.position
-        # Regular players get no icons or status text
-        if type is PlayerState.REGULAR:
-            self._marked_icon.text = ''
-            self._marked_text.text = ''
-            self._marked_icon.opacity = 0.0
-            self._name_text.flatness = 1.0
-            assert self.node
-            self.node.color = (1.0, 1.0, 1.0)
-        # Marked players get ALL of the attention - red portrait, red text and icon overlaying the portrait
-        elif type is PlayerState.MARKED:
-            self._marked_icon.text = babase.charstr(babase.SpecialChar.HAL)
-            self._marked_icon.position = (pos[0] - 1, pos[1] - 13)
-            self._marked_icon.opacity = 1.0
-            self._marked_text.text = 'Marked!'
-            self._marked_text.color = (1.0, 0.0, 0.0)
-            self._name_text.flatness = 0.0
-            assert self.node
-            self.node.color = (1.0, 0.2, 0.2)
-        # Stunned players are just as important - yellow portrait, yellow text and moon icon.
-        elif type is PlayerState.STUNNED:
-            self._marked_icon.text = babase.charstr(babase.SpecialChar.MOON)
-            self._marked_icon.position = (pos[0] - 2, pos[1] - 12)
-            self._marked_icon.opacity = 1.0
-            self._marked_text.text = 'Stunned!'
-            self._marked_text.color = (1.0, 1.0, 0.0)
-            assert self.node
-            self.node.color = (0.75, 0.75, 0.0)
-        # Eliminated players get special treatment.
-        # We make the portrait semi-transparent, while adding some visual flair with an fading skull icon and text.
-        elif type is PlayerState.ELIMINATED:
-            self._marked_icon.text = babase.charstr(babase.SpecialChar.SKULL)
-            self._marked_icon.position = (pos[0] - 2, pos[1] - 12)
-            self._marked_text.text = 'You\'re Out!'
-            self._marked_text.color = (0.5, 0.5, 0.5)
+        attrs = ICON_STATE_ATTRS.get(type)
+        if attrs is None:
+            # If we beef something up, let the game know we made a mess in the code by providing a non-existant state.
+            raise Exception("invalid PlayerState type")
 
+        assert self.node
+        self._marked_icon_writer.apply(attrs['marked_icon'])
+        if type in ICON_STATE_OFFSETS:
+            pos = self.node.position
+            offset = ICON_STATE_OFFSETS[type]
+            self._marked_icon_writer.set('position', (pos[0] + offset[0], pos[1] + offset[1]))
+        self._marked_text_writer.apply(attrs['marked_text'])
+        self._name_text_writer.apply(attrs['name_text'])
+        self._portrait_writer.apply(attrs['portrait'])
+
+        if type is PlayerState.ELIMINATED:
             # Animate text and icon
             animation_end_time = 1.5 if bool(self.activity.settings['Epic Mode']) else 3.0
             ba.animate(self._marked_icon, 'opacity', {
@@ -208,14 +786,8 @@ class Icon(ba.Actor):
             ba.animate(self._marked_text, 'opacity', {
                        0: 1.0,
                        animation_end_time: 0.0})
-
-            self._name_text.opacity = 0.2
-            assert self.node
-            self.node.color = (0.7, 0.3, 0.3)
-            self.node.opacity = 0.2
-        else:
-            # If we beef something up, let the game know we made a mess in the code by providing a non-existant state.
-            raise Exception("invalid PlayerState type")
+            self._marked_icon_writer.forget('opacity')
+            self._marked_text_writer.forget('opacity')
 
     # Set where our icon is positioned on the screen and how big it is.
     def set_position_and_scale(self, position: tuple[float, float],
@@ -231,29 +803,53 @@ class Icon(ba.Actor):
 
 # This gamemode heavily relies on edited player behavior.
 # We need that amount of control, so we're gonna create our own class and use the original PlayerSpaz as our blueprint.
+# PlayerSpaz lives in a module we don't want to import until a game actually starts,
+# so everything we change is in this mixin, and _load_actors combines it with PlayerSpaz into PotatoPlayerSpaz.
 
 
-class PotatoPlayerSpaz(PlayerSpaz):
+class PotatoPlayerSpazMixin:
 
     def __init__(self, *args, **kwargs):
 
         super().__init__(*args, **kwargs)  # unchanged Spaz __init__ code goes here
-        self.dropped_bombs = []  # we use this to track bombs thrown by the player
+        # We use this to track bombs thrown by the player.
+        # It's a dict used as an ordered set, so a bomb can be removed without searching for it.
+        self.dropped_bombs: dict[Bomb, None] = {}
+        # Whether our bombs currently carry a red light.
+        self._bombs_marked = False
 
         # We meed to modify how grabs work, but mostly small changes to prevent infinites
         # This cooldown will work differently compared to punches, which we'll see later
         self._able_to_pickup = True
-        self._pickup_timer: ba.Timer = None
+        self._pickup_timer: WheelTimer = None
         self._pickup_cooldown = 0.5
 
+        # We use the factory's sounds on almost every hit, so let's look it up once.
+        self._factory = SpazFactory.get()
+
+        # The light and timer text for MARKED and STUNNED players.
+        # Most players are never marked or stunned during a life, so these are only created when needed.
+        self.marked_light: ba.Node = None
+        self.marked_timer_offset: ba.Node = None
+        self.marked_timer_text: ba.Node = None
+        self._marked_light_writer: NodeWriter = None
+        self._marked_timer_text_writer: NodeWriter = None
+
+    # Create the light and timer text shown over MARKED and STUNNED players, unless we already have them.
+    def create_marked_visuals(self) -> None:
+        if self.marked_light or not self.node:
+            return
+
         # Define a marked light
+        light_attrs = {'position': self.node.position,
+                       'radius': 0.15,
+                       'intensity': 0.0,
+                       'height_attenuated': False,
+                       'color': (1.0, 0.0, 0.0)}
         self.marked_light = ba.newnode('light',
                                        owner=self.node,
-                                       attrs={'position': self.node.position,
-                                              'radius': 0.15,
-                                              'intensity': 0.0,
-                                              'height_attenuated': False,
-                                              'color': (1.0, 0.0, 0.0)})
+                                       attrs=light_attrs)
+        self._marked_light_writer = NodeWriter(self.marked_light, light_attrs)
 
         # Pulsing red light when the player is Marked
         ba.animate(self.marked_light, 'radius', {
@@ -269,16 +865,42 @@ class PotatoPlayerSpaz(PlayerSpaz):
             'operation': 'add'})
         self.node.connectattr('torso_position', self.marked_timer_offset, 'input2')
 
-        self.marked_timer_text = ba.newnode('text', owner=self.node, attrs={
-            'text': '',
-            'in_world': True,
-            'shadow': 0.4,
-            'color': (RED_COLOR[0], RED_COLOR[1], RED_COLOR[2], 0.0),
-            'flatness': 0,
-            'scale': 0.02,
-            'h_align': 'center'})
+        text_attrs = {'text': '',
+                      'in_world': True,
+                      'shadow': 0.4,
+                      'color': (RED_COLOR[0], RED_COLOR[1], RED_COLOR[2], 0.0),
+                      'flatness': 0,
+                      'scale': 0.02,
+                      'h_align': 'center'}
+        self.marked_timer_text = ba.newnode('text', owner=self.node, attrs=text_attrs)
+        self._marked_timer_text_writer = NodeWriter(self.marked_timer_text, text_attrs)
         self.marked_timer_offset.connectattr('output', self.marked_timer_text, 'position')
 
+    # Show how a MARKED or STUNNED player should look.
+    def show_marked_state(self, state: PlayerState) -> None:
+        if not self.marked_light:
+            return
+        attrs = MARKED_VISUAL_ATTRS[state]
+        self._marked_light_writer.apply(attrs['light'])
+        self._marked_timer_text_writer.apply(attrs['text'])
+
+    # Change the timer above our head. Does nothing if we have no timer to show.
+    def set_marked_timer_text(self, text: str) -> None:
+        if self._marked_timer_text_writer:
+            self._marked_timer_text_writer.set('text', text)
+
+    # Once we're back to REGULAR or out of the game, we don't need the marked visuals anymore.
+    # Deleting the light also gets rid of its looping animation.
+    def delete_marked_visuals(self) -> None:
+        for node in (self.marked_light, self.marked_timer_offset, self.marked_timer_text):
+            if node:
+                node.delete()
+        self.marked_light = None
+        self.marked_timer_offset = None
+        self.marked_timer_text = None
+        self._marked_light_writer = None
+        self._marked_timer_text_writer = None
+
     # We need to modify how grabs work to prevent inifinites.
     # Since it's a tiny overhaul, we need to rewrite this function entirely.
     # If you're not marked, releasing someone from a grab will prevent you from grabbing for a tiny bit.
@@ -294,7 +916,8 @@ class PotatoPlayerSpaz(PlayerSpaz):
             _marked = self.node.source_player.state == PlayerState.MARKED
             if not _marked and _holding_someone:
                 self._able_to_pickup = False
-                self._pickup_timer = ba.Timer(self._pickup_cooldown, ba.WeakCall(self._on_pickup_timer_timeout))
+                self._pickup_timer = self.activity.timers.timer(self._pickup_cooldown,
+                                                                ba.WeakCall(self._on_pickup_timer_timeout))
             self.node.pickup_pressed = True
             self.last_pickup_time_ms = t_ms
 
@@ -313,133 +936,176 @@ class PotatoPlayerSpaz(PlayerSpaz):
         # Let's make sure the player actually created a new bomb
         if bomb:
             # Add our bomb to the list of our tracked bombs
-            self.dropped_bombs.append(bomb)
-            # Bring a light
-            bomb.bomb_marked_light = ba.newnode('light',
-                                                owner=bomb.node,
-                                                attrs={'position': bomb.node.position,
-                                                       'radius': 0.04,
-                                                       'intensity': 0.0,
-                                                       'height_attenuated': False,
-                                                       'color': (1.0, 0.0, 0.0)})
-            # Attach the light to the bomb
-            bomb.node.connectattr('position', bomb.bomb_marked_light, 'position')
-            # Let's adjust all lights for all bombs that we own.
-            self.set_bombs_marked()
+            self.dropped_bombs[bomb] = None
+            # Only Marked players' bombs get a light, so we don't waste a node on everyone else's bombs.
+            bomb.bomb_marked_light = None
+            if self._bombs_marked:
+                self._add_bomb_light(bomb)
             # When the bomb physics node dies, call a function.
             bomb.node.add_death_action(
                 ba.WeakCall(self.bomb_died, bomb))
+        return bomb
 
     # Here's the function that gets called when one of the player's bombs dies.
-    # We reference the player's dropped_bombs list and remove the bomb that died.
+    # We reference the player's dropped_bombs and remove the bomb that died.
 
     def bomb_died(self, bomb):
-        self.dropped_bombs.remove(bomb)
+        self.dropped_bombs.pop(bomb, None)
 
-    # Go through all the bombs this player has in the world.
-    # Paint them red if the owner is marked, turn off the light otherwise.
+    # Bring a light and attach it to the bomb.
     # We need this light to inform the player about bombs YOU DON'T want to get hit by.
+    def _add_bomb_light(self, bomb) -> None:
+        if not bomb.node:
+            return
+        bomb.bomb_marked_light = ba.newnode('light',
+                                            owner=bomb.node,
+                                            attrs={'position': bomb.node.position,
+                                                   'radius': 0.04,
+                                                   'intensity': 20.0,
+                                                   'height_attenuated': False,
+                                                   'color': (1.0, 0.0, 0.0)})
+        bomb.node.connectattr('position', bomb.bomb_marked_light, 'position')
+
+    # Paint all the bombs this player has in the world red if the owner is marked, remove their lights otherwise.
+    # Bombs only need touching when our marked status actually flips, so most calls return right away.
     def set_bombs_marked(self):
+        marked = self._player.state == PlayerState.MARKED
+        if marked == self._bombs_marked:
+            return
+        self._bombs_marked = marked
         for bomb in self.dropped_bombs:
-            bomb.bomb_marked_light.intensity = 20.0 if self._player.state == PlayerState.MARKED else 0.0
-
+            if marked:
+                self._add_bomb_light(bomb)
+            elif bomb.bomb_marked_light:
+                bomb.bomb_marked_light.delete()
+                bomb.bomb_marked_light = None
+
+    # Messages are handled by looking up their type in a table instead of walking an isinstance chain.
+    # Bombs can send dozens of HitMessages per blast, so this is our hottest code path.
     def handlemessage(self, msg):
-        # Since our gamemode relies heavily on players passing the mark to other players
-        # we need to have access to this message. This gets called when the player takes damage for any reason.
-        if isinstance(msg, ba.HitMessage):
-            # This is basically the same HitMessage code as in the original Spaz.
-            # The only difference is that there is no health bar and you can't die with punches or bombs.
-            # On top of that we also have to fix gamemode breaking exploits related to this change in gameplay.
-            # Also some useless or redundant code was removed.
-            # I'm still gonna comment all of it since we're here.
-            if not self.node:
-                return None
-
-            # Here's all the damage and force calculations unchanged from the source.
-            mag = msg.magnitude * self.impact_scale
-            velocity_mag = msg.velocity_magnitude * self.impact_scale
-            damage_scale = 0.22
-            
-            # If we're marked, decrease the stun so its less punishing.
-            victim_marked: bool = False
-            if hasattr(self.node.source_player, "state"):
-                if self.node.source_player.state == PlayerState.MARKED:
-                    victim_marked = True
-                    mag *= MARKED_KNOCKBACK_SCALE
-                    velocity_mag *= MARKED_KNOCKBACK_SCALE
-
-            # If the attacker is marked, pass that mark to us.
-            self.activity.pass_mark(msg._source_player, self._player)
-
-            # When stun timer runs out, we explode. Let's make sure our own explosion does throw us around.
-            if msg.hit_type == 'stun_blast' and msg._source_player == self.source_player:
-                return True
-            # If the attacker is healthy and we're stunned, do a flash and play a sound, then ignore the rest of the code.
-            if self.source_player.state == PlayerState.STUNNED and msg._source_player != PlayerState.MARKED:
-                self.node.handlemessage('flash')
-                SpazFactory.get().block_sound.play(1, position=self.node.position)
-                return True
-
-            # We use them to apply a physical force to the player.
-            # Normally this is also used for damage, but we we're not gonna do it.
-            # We're still gonna calculate it, because it's still responsible for knockback.
-            # However knockback is also stun, which can be problematic in this mode where you can't die.
-            # If a player is already stunned, let's disable all knockback.
-            use_knockback = not self.node.knockout > 0.0
-            assert msg.force_direction is not None
-            self.node.handlemessage(
-                'impulse', msg.pos[0], msg.pos[1], msg.pos[2],
-                msg.velocity[0], msg.velocity[1], msg.velocity[2], mag,
-                velocity_mag, msg.radius, not use_knockback, msg.force_direction[0],
-                msg.force_direction[1], msg.force_direction[2])
-            damage = int(damage_scale * self.node.damage)
-
-            # We're multiplying damage after applying knockback so that it still feels like we did a lot of damage.
-            # This new damage value influences particles and sound, so we gotta keep it the same.
-            if victim_marked:
-                damage /= MARKED_KNOCKBACK_SCALE
-
-            self.node.handlemessage('hurt_sound')  # That's how we play spaz node's hurt sound
-
-            # Play punch impact sounds based on damage if it was a punch.
-            # We don't show damage percentages, because it's irrelevant.
-            if msg.hit_type == 'punch':
-                self.on_punched(damage)
-
-                if damage >= 500:
-                    sounds = SpazFactory.get().punch_sound_strong
-                    sound = sounds[random.randrange(len(sounds))]
-                elif damage >= 100:
-                    sound = SpazFactory.get().punch_sound
-                else:
-                    sound = SpazFactory.get().punch_sound_weak
-                sound.play(1.0, position=self.node.position)
-
-                # Throw up some chunks.
-                assert msg.force_direction is not None
-                ba.emitfx(position=msg.pos,
-                          velocity=(msg.force_direction[0] * 0.5,
-                                    msg.force_direction[1] * 0.5,
-                                    msg.force_direction[2] * 0.5),
-                          count=min(10, 1 + int(damage * 0.0025)),
-                          scale=0.3,
-                          spread=0.03)
-
-                ba.emitfx(position=msg.pos,
-                          chunk_type='sweat',
-                          velocity=(msg.force_direction[0] * 1.3,
-                                    msg.force_direction[1] * 1.3 + 5.0,
-                                    msg.force_direction[2] * 1.3),
-                          count=min(30, 1 + int(damage * 0.04)),
-                          scale=0.9,
-                          spread=0.28)
-
-                # Momentary flash. This spawns around where the Spaz's punch would be (we're kind of guessing here).
-                hurtiness = damage * 0.003
-                punchpos = (msg.pos[0] + msg.force_direction[0] * 0.02,
-                            msg.pos[1] + msg.force_direction[1] * 0.02,
-                            msg.pos[2] + msg.force_direction[2] * 0.02)
-                flash_color = (1.0, 0.8, 0.4)
+        handler = self._message_handlers.get(type(msg))
+        if handler is None:
+            handler = self._resolve_message_handler(type(msg))
+        return handler(self, msg)
+
+    # Find a handler for a message type we haven't seen yet, respecting subclasses of the messages we handle.
+    # The result is cached in the table, so this only runs once per message type.
+    @classmethod
+    def _resolve_message_handler(cls, msgtype: type):
+        handler = cls._handle_other_message
+        for base in msgtype.__mro__:
+            if base in cls._message_handlers:
+                handler = cls._message_handlers[base]
+                break
+        cls._message_handlers[msgtype] = handler
+        return handler
+
+    # Since our gamemode relies heavily on players passing the mark to other players
+    # we need to have access to this message. This gets called when the player takes damage for any reason.
+    def _handle_hit_message(self, msg: ba.HitMessage):
+        # This is basically the same HitMessage code as in the original Spaz.
+        # The only difference is that there is no health bar and you can't die with punches or bombs.
+        # On top of that we also have to fix gamemode breaking exploits related to this change in gameplay.
+        # Also some useless or redundant code was removed.
+        # I'm still gonna comment all of it since we're here.
+        node = self.node
+        if not node:
+            return None
+
+        # Here's all the damage and force calculations unchanged from the source.
+        mag = msg.magnitude * self.impact_scale
+        velocity_mag = msg.velocity_magnitude * self.impact_scale
+        damage_scale = 0.22
+        owner = self._player
+        attacker = msg._source_player
+
+        # If we're marked, decrease the stun so its less punishing.
+        victim_marked: bool = owner.state == PlayerState.MARKED
+        if victim_marked:
+            mag *= MARKED_KNOCKBACK_SCALE
+            velocity_mag *= MARKED_KNOCKBACK_SCALE
+
+        # If the attacker is marked, pass that mark to us.
+        self.activity.pass_mark(attacker, owner)
+
+        # When stun timer runs out, we explode. Let's make sure our own explosion does throw us around.
+        if msg.hit_type == 'stun_blast' and attacker == owner:
+            return True
+        # If the attacker is healthy and we're stunned, do a flash and play a sound, then ignore the rest of the code.
+        # Passing the mark might have changed our state, so this is the one place we read it again.
+        if owner.state == PlayerState.STUNNED and attacker != PlayerState.MARKED:
+            node.handlemessage('flash')
+            self._factory.block_sound.play(1, position=node.position)
+            return True
+
+        # We use them to apply a physical force to the player.
+        # Normally this is also used for damage, but we we're not gonna do it.
+        # We're still gonna calculate it, because it's still responsible for knockback.
+        # However knockback is also stun, which can be problematic in this mode where you can't die.
+        # If a player is already stunned, let's disable all knockback.
+        use_knockback = not node.knockout > 0.0
+        force_direction = msg.force_direction
+        assert force_direction is not None
+        pos = msg.pos
+        velocity = msg.velocity
+        node.handlemessage(
+            'impulse', pos[0], pos[1], pos[2],
+            velocity[0], velocity[1], velocity[2], mag,
+            velocity_mag, msg.radius, not use_knockback, force_direction[0],
+            force_direction[1], force_direction[2])
+        damage = int(damage_scale * node.damage)
+
+        # We're multiplying damage after applying knockback so that it still feels like we did a lot of damage.
+        # This new damage value influences particles and sound, so we gotta keep it the same.
+        if victim_marked:
+            damage /= MARKED_KNOCKBACK_SCALE
+
+        node.handlemessage('hurt_sound')  # That's how we play spaz node's hurt sound
+
+        hit_type = msg.hit_type
+        # Play punch impact sounds based on damage if it was a punch.
+        # We don't show damage percentages, because it's irrelevant.
+        if hit_type == 'punch':
+            self.on_punched(damage)
+
+            factory = self._factory
+            if damage >= 500:
+                sounds = factory.punch_sound_strong
+                sound = sounds[random.randrange(len(sounds))]
+            elif damage >= 100:
+                sound = factory.punch_sound
+            else:
+                sound = factory.punch_sound_weak
+            sound.play(1.0, position=node.position)
+
+            # Throw up some chunks.
+            effects = self.activity.effects
+            effects.emitfx(position=pos,
+                           velocity=(force_direction[0] * 0.5,
+                                     force_direction[1] * 0.5,
+                                     force_direction[2] * 0.5),
+                           count=min(10, 1 + int(damage * 0.0025)),
+                           scale=0.3,
+                           spread=0.03)
+
+            effects.emitfx(position=pos,
+                           chunk_type='sweat',
+                           velocity=(force_direction[0] * 1.3,
+                                     force_direction[1] * 1.3 + 5.0,
+                                     force_direction[2] * 1.3),
+                           count=min(30, 1 + int(damage * 0.04)),
+                           scale=0.9,
+                           spread=0.28)
+
+            # Momentary flash. This spawns around where the Spaz's punch would be (we're kind of guessing here).
+            hurtiness = damage * 0.003
+            punchpos = (pos[0] + force_direction[0] * 0.02,
+                        pos[1] + force_direction[1] * 0.02,
+                        pos[2] + force_direction[2] * 0.02)
+            flash_color = (1.0, 0.8, 0.4)
+            # The light and the flash are just for looks, so they're the first thing to go when things get hectic.
+            # They always come as a pair, so the pair counts as one light against the budget.
+            if effects.allow_light():
                 light = ba.newnode(
                     'light',
                     attrs={
@@ -459,81 +1125,131 @@ class PotatoPlayerSpaz(PlayerSpaz):
                                    })
                 ba.timer(0.06, flash.delete)
 
-            # Physics collision particles.
-            if msg.hit_type == 'impact':
-                assert msg.force_direction is not None
-                ba.emitfx(position=msg.pos,
-                          velocity=(msg.force_direction[0] * 2.0,
-                                    msg.force_direction[1] * 2.0,
-                                    msg.force_direction[2] * 2.0),
-                          count=min(10, 1 + int(damage * 0.01)),
-                          scale=0.4,
-                          spread=0.1)
-
-            # Briefly flash when hit.
-            # We shouldn't do this if we're dead.
-            if self.hitpoints > 0:
-
-                self.node.handlemessage('flash')
-
-                # If we're holding something, drop it.
-                if damage > 0.0 and self.node.hold_node:
-                    self.node.hold_node = None
-        # If we get grabbed, this function is called.
-        # We want to pass along the mark with grabs too.
-        elif isinstance(msg, PickupMessage):
-            # Make sure our body exists.
-            if not self.node:
-                return None
-
-            # Let's get all collision data if we can. Otherwise cancel.
-            try:
-                collision = ba.getcollision()
-                opposingnode = collision.opposingnode
-            except ba.NotFoundError:
-                return True
-
-            # Our grabber needs to be a Spaz
-            if opposingnode.getnodetype() == 'spaz':
-                # Disallow grabbing if a healthy player tries to grab us and we're stunned.
-                # If they're marked, continue with our scheduled program.
-                # It's the same sound and flashing behavior as hitting a stunned player as a healthy player.
-                if hasattr(opposingnode.source_player, "state"):
-                    if (opposingnode.source_player.state == PlayerState.STUNNED and self.source_player.state != PlayerState.MARKED):
-                        opposingnode.handlemessage('flash')
-                        SpazFactory.get().block_sound.play(
-                            1.0,
-                            position=self.node.position,
-                        )
-                        return True
-                    # If they're marked and we're healthy or stunned, pass that mark along to us.
-                    elif opposingnode.source_player.state in [PlayerState.REGULAR, PlayerState.STUNNED] and self.source_player.state == PlayerState.MARKED:
-                        self.activity.pass_mark(self.source_player, opposingnode.source_player)
-
-            # Our work is done. Continue with the rest of the grabbing behavior as usual.
-            super().handlemessage(msg)
-        # Dying is important in this gamemode and as such we need to address this behavior.
-        elif isinstance(msg, ba.DieMessage):
-
-            # If a player left the game, inform our gamemode logic.
-            if msg.how == ba.DeathType.LEFT_GAME:
-                self.activity.player_left(self.source_player)
-
-            # If a MARKED or STUNNED player dies, hide the text from the previous spaz.
-            if self.source_player.state in [PlayerState.MARKED, PlayerState.STUNNED]:
-                self.marked_timer_text.color = (self.marked_timer_text.color[0],
-                                                self.marked_timer_text.color[1],
-                                                self.marked_timer_text.color[2],
-                                                0.0)
-                ba.animate(self.marked_light, 'intensity', {
-                    0: self.marked_light.intensity,
-                    0.5: 0.0})
-
-            # Continue with the rest of the behavior.
-            super().handlemessage(msg)
-        # If a message is something we haven't modified yet, let's pass it along to the original.
-        else:
-            super().handlemessage(msg)
+        # Physics collision particles.
+        elif hit_type == 'impact':
+            self.activity.effects.emitfx(position=pos,
+                                         velocity=(force_direction[0] * 2.0,
+                                                   force_direction[1] * 2.0,
+                                                   force_direction[2] * 2.0),
+                                         count=min(10, 1 + int(damage * 0.01)),
+                                         scale=0.4,
+                                         spread=0.1)
+
+        # Briefly flash when hit.
+        # We shouldn't do this if we're dead.
+        if self.hitpoints > 0:
+
+            node.handlemessage('flash')
+
+            # If we're holding something, drop it.
+            if damage > 0.0 and node.hold_node:
+                node.hold_node = None
+        return None
+
+    # If we get grabbed, this function is called.
+    # We want to pass along the mark with grabs too.
+    def _handle_pickup_message(self, msg: PickupMessage):
+        # Make sure our body exists.
+        if not self.node:
+            return None
+
+        # Let's get all collision data if we can. Otherwise cancel.
+        try:
+            collision = ba.getcollision()
+            opposingnode = collision.opposingnode
+        except ba.NotFoundError:
+            return True
+
+        # Our grabber needs to be a Spaz
+        if opposingnode.getnodetype() == 'spaz':
+            # Disallow grabbing if a healthy player tries to grab us and we're stunned.
+            # If they're marked, continue with our scheduled program.
+            # It's the same sound and flashing behavior as hitting a stunned player as a healthy player.
+            opposing_player = opposingnode.source_player
+            if hasattr(opposing_player, "state"):
+                opposing_state = opposing_player.state
+                own_state = self.source_player.state
+                if (opposing_state == PlayerState.STUNNED and own_state != PlayerState.MARKED):
+                    opposingnode.handlemessage('flash')
+                    self._factory.block_sound.play(
+                        1.0,
+                        position=self.node.position,
+                    )
+                    return True
+                # If they're marked and we're healthy or stunned, pass that mark along to us.
+                elif opposing_state in (PlayerState.REGULAR, PlayerState.STUNNED) and own_state == PlayerState.MARKED:
+                    self.activity.pass_mark(self.source_player, opposing_player)
+
+        # Our work is done. Continue with the rest of the grabbing behavior as usual.
+        super().handlemessage(msg)
+        return None
+
+    # Dying is important in this gamemode and as such we need to address this behavior.
+    def _handle_die_message(self, msg: ba.DieMessage):
+        # If a player left the game, inform our gamemode logic.
+        if msg.how == ba.DeathType.LEFT_GAME:
+            self.activity.player_left(self.source_player)
+
+        # If a MARKED or STUNNED player dies, hide the text from the previous spaz.
+        if self.marked_light and self.source_player.state in (PlayerState.MARKED, PlayerState.STUNNED):
+            color = self.marked_timer_text.color
+            self._marked_timer_text_writer.set('color', (color[0], color[1], color[2], 0.0))
+            ba.animate(self.marked_light, 'intensity', {
+                0: self.marked_light.intensity,
+                0.5: 0.0})
+            self._marked_light_writer.forget('intensity')
+
+        # Continue with the rest of the behavior.
+        super().handlemessage(msg)
+        return None
+
+    # Falling off the map normally kills us.
+    # If spaz recycling is on, the gamemode puts us back on the map instead.
+    def _handle_out_of_bounds_message(self, msg: ba.OutOfBoundsMessage):
+        if RECYCLE_SPAZ_ON_FALL and self.is_alive() and self.activity.recycle_spaz(self):
+            return None
+        super().handlemessage(msg)
+        return None
+
+    # If a message is something we haven't modified yet, let's pass it along to the original.
+    def _handle_other_message(self, msg):
+        super().handlemessage(msg)
+        return None
+
+    # Message type -> handler. Filled in by _load_actors, since PickupMessage comes from the spaz module.
+    _message_handlers: dict = {}
+
+
+# Plugins get imported when the game starts up, so let's keep importing this file quick.
+# The actor modules we build on get imported the first time a Hot Potato game is created instead.
+def _load_actors() -> None:
+    global SpazFactory, PickupMessage, PlayerSpaz, Bomb, Blast, PotatoPlayerSpaz
+    if 'PotatoPlayerSpaz' in globals():
+        return
+    from bascenev1lib.actor.spaz import SpazFactory
+    from bascenev1lib.actor.spaz import PickupMessage
+    from bascenev1lib.actor.playerspaz import PlayerSpaz
+    from bascenev1lib.actor.bomb import Bomb
+    from bascenev1lib.actor.bomb import Blast
+
+    PotatoPlayerSpaz = type('PotatoPlayerSpaz', (PotatoPlayerSpazMixin, PlayerSpaz), {'__module__': __name__})
+    PotatoPlayerSpaz._message_handlers = {
+        ba.HitMessage: PotatoPlayerSpaz._handle_hit_message,
+        PickupMessage: PotatoPlayerSpaz._handle_pickup_message,
+        ba.DieMessage: PotatoPlayerSpaz._handle_die_message,
+        ba.OutOfBoundsMessage: PotatoPlayerSpaz._handle_out_of_bounds_message,
+    }
+
+
+# Anyone asking for one of the names above from outside gets them loaded on the spot.
+_LAZY_NAMES = ('SpazFactory', 'PickupMessage', 'PlayerSpaz', 'Bomb', 'Blast', 'PotatoPlayerSpaz')
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_NAMES:
+        _load_actors()
+        return globals()[name]
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 # A concept of a player is very useful to reference if we don't have a player character present (maybe they died).
 
@@ -546,17 +1262,22 @@ class Player(ba.Player['Team']):
         self.icon: Icon = None
         self.fall_times: int = 0
         self.state: PlayerState = PlayerState.REGULAR
-        self.stunned_time_remaining = None
+        # How many 0.1 second ticks of stun we have left. Integers don't drift like floats do.
+        self.stunned_ticks_remaining: int = 0
         # These are references to timers responsible for handling stunned behavior.
         self.stunned_timer = None
         self.stunned_update_timer = None
+        # The light flashing at our spawn point. We keep reusing it instead of creating one every respawn.
+        self.spawn_light: ba.Node = None
+        # Who we are in the round log.
+        self.log_id: int = -1
 
     # If we're stunned, a timer calls this every 0.1 seconds.
     def stunned_timer_tick(self) -> None:
         # Decrease our time remaining then change the text displayed above the Spaz's head
-        self.stunned_time_remaining -= 0.1
-        self.stunned_time_remaining = max(0.0, self.stunned_time_remaining)
-        self.actor.marked_timer_text.text = str(round(self.stunned_time_remaining, 2))
+        if self.stunned_ticks_remaining > 0:
+            self.stunned_ticks_remaining -= 1
+        self.actor.set_marked_timer_text(STUN_TICK_STRINGS[self.stunned_ticks_remaining])
 
     # When stun time is up, call this function.
     def stun_remove(self) -> None:
@@ -579,23 +1300,26 @@ class Player(ba.Player['Team']):
         # Let's remember our old state before we change it.
         old_state = self.state
 
+        # MARKED and STUNNED players get a light and a timer above their heads, so make sure those exist.
+        if state in (PlayerState.MARKED, PlayerState.STUNNED):
+            self.actor.create_marked_visuals()
+
         # If we just became stunned, do all of this:
         if old_state != PlayerState.STUNNED and state == PlayerState.STUNNED:
             self.actor.disconnect_controls_from_player()  # Disallow all movement and actions
             # Let's set our stun time based on the amount of times we fell out of the map.
-            if self.fall_times < len(FALL_PENALTIES):
-                stun_time = FALL_PENALTIES[self.fall_times]
-            else:
-                stun_time = FALL_PENALTIES[len(FALL_PENALTIES) - 1]
+            stun_time = stun_time_for_falls(self.fall_times)
 
-            self.stunned_time_remaining = stun_time  # Set our stun time remaining
+            self.stunned_ticks_remaining = round(stun_time * STUN_TICKS_PER_SECOND)  # Set our stun time remaining
             # Remove our stun once the time is up
-            self.stunned_timer = ba.Timer(stun_time + 0.1, ba.Call(self.stun_remove))
-            self.stunned_update_timer = ba.Timer(0.1, ba.Call(
+            # Both timers run on the activity's timer wheel instead of being separate engine timers.
+            timers = ba.getactivity().timers
+            self.stunned_timer = timers.timer(stun_time + 0.1, ba.Call(self.stun_remove))
+            self.stunned_update_timer = timers.timer(0.1, ba.Call(
                 self.stunned_timer_tick), repeat=True)  # Call a function every 0.1 seconds
             self.fall_times += 1  # Increase the amount of times we fell by one
             # Change the text above the Spaz's head to total stun time
-            self.actor.marked_timer_text.text = str(stun_time)
+            self.actor.set_marked_timer_text(STUN_TICK_STRINGS[self.stunned_ticks_remaining])
 
         # If we were stunned, but now we're not, let's reconnect our controls.
         # CODING CHALLENGE: to punch or bomb immediately after the stun ends, you need to
@@ -611,25 +1335,24 @@ class Player(ba.Player['Team']):
             self.stunned_update_timer = None
 
         # Here's all the light and text colors that we set depending on the state.
-        if state == PlayerState.MARKED:
-            self.actor.marked_light.intensity = 1.5
-            self.actor.marked_light.color = (1.0, 0.0, 0.0)
-            self.actor.marked_timer_text.color = (RED_COLOR[0],
-                                                  RED_COLOR[1],
-                                                  RED_COLOR[2],
-                                                  1.0)
-        elif state == PlayerState.STUNNED:
-            self.actor.marked_light.intensity = 0.5
-            self.actor.marked_light.color = (1.0, 1.0, 0.0)
-            self.actor.marked_timer_text.color = (YELLOW_COLOR[0],
-                                                  YELLOW_COLOR[1],
-                                                  YELLOW_COLOR[2],
-                                                  1.0)
+        if state in (PlayerState.MARKED, PlayerState.STUNNED):
+            self.actor.show_marked_state(state)
         else:
-            self.actor.marked_light.intensity = 0.0
-            self.actor.marked_timer_text.text = ''
+            # Nothing to show anymore, so let's get rid of the light and text entirely.
+            self.actor.delete_marked_visuals()
 
         self.state = state
+        activity = ba.getactivity()
+        if activity.round_log:
+            activity.round_log.record(RoundEvent.STATE, self.log_id, state=state)
+
+        # Keep the activity's per-state index in sync, so it never has to scan every player.
+        # Players that were taken out of the index (like those who left) stay out of it.
+        players_by_state = activity.players_by_state
+        if self in players_by_state[old_state]:
+            players_by_state[old_state].discard(self)
+            players_by_state[state].add(self)
+
         self.actor.set_bombs_marked()  # Light our bombs red if we're Marked, removes the light otherwise
         self.icon.set_marked_icon(state)  # Update our icon
 
@@ -711,9 +1434,44 @@ class HotPotato(ba.TeamGameActivity[Player, ba.Team]):
 
     # Here we define everything the gamemode needs, like sounds and settings.
     def __init__(self, settings: dict):
+        # First game of the session? Time to import the actor modules we need.
+        _load_actors()
         super().__init__(settings)
         self.settings = settings
 
+        # Every player in the game sorted by their state.
+        # Player.set_state moves players between these, which saves us from looping over all players.
+        self.players_by_state: dict[PlayerState, PlayerIndex] = {state: PlayerIndex() for state in PlayerState}
+
+        # All of our countdowns (stuns, grab cooldowns, elimination ticks) share this timer wheel.
+        self.timers = TimerWheel()
+        # Explosions of eliminated players that haven't gone off yet, see _eliminate_marked_players.
+        self._elimination_effect_queue: deque[tuple[Player, PotatoPlayerSpaz, Sequence[float],
+                                                    Sequence[float], int]] = deque()
+        self._elimination_effect_timer: WheelTimer | None = None
+
+        # All purely cosmetic particles and lights go through here, so chaotic moments don't tank the server.
+        self.effects = EffectsGovernor(self)
+
+        # Players who die together (say, from one big explosion) get spawned back together.
+        self.respawn_waves = RespawnWaves(self, self._respawn)
+
+        # Everything important that happens this round gets written down here.
+        self.round_log: RoundLogger | None = RoundLogger(settings) if RECORD_ROUNDS else None
+
+        # Keep an eye out for slow callbacks if we were asked to.
+        if WATCHDOG_BUDGET_MS:
+            import perf_hooks
+            perf_hooks.watch(self, WATCHDOG_BUDGET_MS, self.describe_state)
+
+        # The elimination countdown only ever shows whole seconds, so let's make those strings once.
+        self._elimination_timer_strings = tuple(sys.intern(str(seconds))
+                                                for seconds in range(int(settings['Elimination Timer']) + 1))
+
+        # Every player's icon needs this texture. Assets belong to the activity they were loaded in,
+        # so we look it up once per game here instead of once per icon.
+        self.icon_outline_texture = ba.gettexture('characterIconMask')
+
         # Let's define all of the sounds we need.
         self._tick_sound = ba.getsound('tick')
         self._player_eliminated_sound = ba.getsound('playerDeath')
@@ -746,6 +1504,9 @@ class HotPotato(ba.TeamGameActivity[Player, ba.Team]):
 
         player.state = PlayerState.REGULAR
         player.fall_times = 0
+        self.players_by_state[PlayerState.REGULAR].add(player)
+        if self.round_log:
+            player.log_id = self.round_log.add_player(player.getname())
 
         # Create our icon and spawn.
         if not self.has_begun():
@@ -755,27 +1516,24 @@ class HotPotato(ba.TeamGameActivity[Player, ba.Team]):
     # Returns every single marked player.
     # This piece of info is used excensively in this gamemode, so it's advantageous to have a function to cut on
     # work and make the gamemode easier to maintain
+    # We return a copy, since callers tend to change player states while looping over the result.
     def get_marked_players(self) -> Sequence[ba.Player]:
-        marked_players = []
-        for p in self.players:
-            if p.state == PlayerState.MARKED:
-                marked_players.append(p)
-        return marked_players
+        return list(self.players_by_state[PlayerState.MARKED])
 
     # Marks a player. This sets their state, spawns some particles and sets the timer text above their heads.
     def mark(self, target: Player) -> None:
         target.set_state(PlayerState.MARKED)
 
-        ba.emitfx(position=target.actor.node.position,
-                  velocity=target.actor.node.velocity,
-                  chunk_type='spark',
-                  count=int(20.0+random.random()*20),
-                  scale=1.0,
-                  spread=1.0)
+        self.effects.emitfx(position=target.actor.node.position,
+                            velocity=target.actor.node.velocity,
+                            chunk_type='spark',
+                            count=int(20.0+random.random()*20),
+                            scale=1.0,
+                            spread=1.0)
         if bool(self.settings['Marked Players use Impact Bombs']):
             target.actor.blast_radius /= IMPACT_BOMB_RADIUS_SCALE # Increase blast radius of impact bombs to be on par with normal bombs
             target.actor.bomb_type = 'impact'
-        target.actor.marked_timer_text.text = str(self.elimination_timer_display)
+        target.actor.set_marked_timer_text(self._elimination_timer_strings[self.elimination_timer_display])
 
     # Removes the mark from the player. This restores the player to its initial state.
     def remove_mark(self, target: Player) -> None:
@@ -787,7 +1545,6 @@ class HotPotato(ba.TeamGameActivity[Player, ba.Team]):
         target.actor.bomb_type = 'normal'
 
         target.set_state(PlayerState.REGULAR)
-        target.actor.marked_timer_text.text = ''
 
     # Pass the mark from one player to another.
     # This is more desirable than calling mark and remove_mark functions constantly and gives us
@@ -796,7 +1553,9 @@ class HotPotato(ba.TeamGameActivity[Player, ba.Team]):
         # Make sure both players meet the requirements
         if not marked_player or not hit_player:
             return
-        if marked_player.state == PlayerState.MARKED and hit_player.state != PlayerState.MARKED:
+        if can_pass_mark(marked_player.state, hit_player.state):
+            if self.round_log:
+                self.round_log.record(RoundEvent.PASS, marked_player.log_id, hit_player.log_id)
             self.mark(hit_player)
             self.remove_mark(marked_player)
 
@@ -807,7 +1566,7 @@ class HotPotato(ba.TeamGameActivity[Player, ba.Team]):
 
         # If there is no marked players, raise an exception.
         # This is used for debugging purposes, which lets us know we messed up somewhere else in the code.
-        if len(self.get_marked_players()) == 0:
+        if marked_player_amount == 0:
             raise Exception("no marked players!")
 
         if self.elimination_timer_display > 1:
@@ -819,7 +1578,7 @@ class HotPotato(ba.TeamGameActivity[Player, ba.Team]):
                     sound_volume,
                     position=target.actor.node.position,
                 )
-                target.actor.marked_timer_text.text = str(self.elimination_timer_display)
+                target.actor.set_marked_timer_text(self._elimination_timer_strings[self.elimination_timer_display])
 
             # When counting down 3, 2, 1 play some dramatic sounds
             if self.elimination_timer_display <= 3:
@@ -838,25 +1597,31 @@ class HotPotato(ba.TeamGameActivity[Player, ba.Team]):
     # This function explodes all marked players
     def _eliminate_marked_players(self) -> None:
         self.marked_tick_timer = None
-        for target in self.get_marked_players():
+        for i, target in enumerate(self.get_marked_players()):
+            # Remember where they were standing before anything else happens to them.
+            spaz = target.actor
+            position = spaz.node.position
+            velocity = spaz.node.velocity
+            sparks = int(16.0+random.random()*60)
+
+            # Everything that matters for the game happens right away.
+            if self.round_log:
+                self.round_log.record(RoundEvent.ELIMINATED, target.log_id)
             target.set_state(PlayerState.ELIMINATED)
-            target.actor.marked_timer_text.text = ''
-
-            Blast(position=target.actor.node.position,
-                  velocity=target.actor.node.velocity,
-                  blast_radius=3.0,
-                  source_player=target).autoretain()
-            ba.emitfx(position=target.actor.node.position,
-                      velocity=target.actor.node.velocity,
-                      count=int(16.0+random.random()*60),
-                      scale=1.5,
-                      spread=2,
-                      chunk_type='spark')
-            target.actor.handlemessage(ba.DieMessage(how='marked_elimination'))
-            target.actor.shatter(extreme=True)
-
+            spaz.handlemessage(ba.DieMessage(how='marked_elimination'))
             self.match_placement.append(target.team)
 
+            # Explosions are expensive though, so if more than one player goes out, let's spread them over a few frames.
+            # The first one goes off right away and the rest wait in a queue that one countdown works through.
+            if i == 0:
+                self._elimination_effects(target, spaz, position, velocity, sparks)
+            else:
+                self._elimination_effect_queue.append((target, spaz, position, velocity, sparks))
+        if self._elimination_effect_queue and self._elimination_effect_timer is None:
+            self._elimination_effect_timer = self.timers.timer(ELIMINATION_EFFECT_STAGGER,
+                                                               ba.WeakCall(self._next_elimination_effect),
+                                                               repeat=True)
+
         self._player_eliminated_sound.play(
             1.0
         )
@@ -864,6 +1629,29 @@ class HotPotato(ba.TeamGameActivity[Player, ba.Team]):
         # Let the gamemode know a Marked
         self.marked_players_died()
 
+    # Set off the next queued explosion, and stop the countdown once they've all gone off.
+    def _next_elimination_effect(self) -> None:
+        queue = self._elimination_effect_queue
+        if queue:
+            self._elimination_effects(*queue.popleft())
+        if not queue:
+            self._elimination_effect_timer = None
+
+    # Blow up an eliminated player. The position and velocity are from the moment they got eliminated.
+    def _elimination_effects(self, target: Player, spaz: PotatoPlayerSpaz,
+                             position: Sequence[float], velocity: Sequence[float], sparks: int) -> None:
+        Blast(position=position,
+              velocity=velocity,
+              blast_radius=3.0,
+              source_player=target).autoretain()
+        self.effects.emitfx(position=position,
+                            velocity=velocity,
+                            count=sparks,
+                            scale=1.5,
+                            spread=2,
+                            chunk_type='spark')
+        spaz.shatter(extreme=True)
+
     # This function should be called when a Marked player dies, like when timer runs out or they leave the game.
     def marked_players_died(self) -> bool:
         alive_players = self.get_alive_players()
@@ -873,19 +1661,41 @@ class HotPotato(ba.TeamGameActivity[Player, ba.Team]):
                 # Let's add our lone survivor to the match placement list.
                 self.match_placement.append(alive_players[0].team)
             # Wait a while to let this sink in before we announce our victor.
-            self._end_game_timer = ba.Timer(1.25, ba.Call(self.end_game))
+            self._end_game_timer = ba.Timer(END_GAME_DELAY, ba.Call(self.end_game))
         else:
             # There's still players remaining, so let's wait a while before marking a new player.
-            self.new_mark_timer = ba.Timer(2.0 if self.slow_motion else 4.0, ba.Call(self.new_mark))
+            self.new_mark_timer = self.timers.timer(EPIC_MARK_DELAY if self.slow_motion else NEXT_MARK_DELAY,
+                                                    ba.Call(self.new_mark))
+
+    # What the game looks like right now. The watchdog attaches this to its reports.
+    def describe_state(self) -> dict[str, int]:
+        return {
+            'players': len(self.players),
+            'marked': len(self.players_by_state[PlayerState.MARKED]),
+            'stunned': len(self.players_by_state[PlayerState.STUNNED]),
+            'bombs': sum(len(player.actor.dropped_bombs) for player in self.players
+                         if isinstance(player.actor, PotatoPlayerSpaz)),
+            'nodes': len(ba.getnodes()),
+        }
+
+    # Players who died and are waiting for their respawn wave don't have a spaz right now, but they're still in the game.
+    def is_in_game(self, player: Player) -> bool:
+        return player.is_alive() or self.respawn_waves.pending(player)
+
+    # Same as len(get_alive_players()), minus the list.
+    def alive_player_count(self) -> int:
+        return sum(self.is_in_game(player)
+                   for state in (PlayerState.REGULAR, PlayerState.MARKED, PlayerState.STUNNED)
+                   for player in self.players_by_state[state])
 
     # Another extensively used function that returns all alive players.
     def get_alive_players(self) -> Sequence[ba.Player]:
         alive_players = []
-        for player in self.players:
-            if player.state == PlayerState.ELIMINATED:
-                continue  # Ignore players who have been eliminated
-            if player.is_alive():
-                alive_players.append(player)
+        # Eliminated players live in their own index, so we don't even look at them.
+        for state in (PlayerState.REGULAR, PlayerState.MARKED, PlayerState.STUNNED):
+            for player in self.players_by_state[state]:
+                if self.is_in_game(player):
+                    alive_players.append(player)
         return alive_players
 
     # This function is called every time we want to start a new "round" by marking a random player.
@@ -895,28 +1705,18 @@ class HotPotato(ba.TeamGameActivity[Player, ba.Team]):
         if self.has_ended():
             return
 
-        possible_targets = self.get_alive_players()
-        all_victims = []
-        # Let's mark TWO players at once if there's 6 or more players. Helps with the pacing.
-        multi_choice = len(possible_targets) > 5
-
-        if multi_choice:
-            # Pick our first victim at random.
-            first_victim = random.choice(possible_targets)
-            all_victims.append(first_victim)
-            possible_targets.remove(first_victim)
-            # Let's pick our second victim, but this time excluding the player we picked earlier.
-            all_victims.append(random.choice(possible_targets))
-        else:
-            # Pick one victim at random.
-            all_victims = [random.choice(possible_targets)]
+        # Bigger lobbies get more marks at once. Helps with the pacing.
+        alive = self.alive_player_count()
+        all_victims = self._choose_mark_victims(mark_count(alive))
 
         # Set time until marked players explode
         self.elimination_timer_display = self.settings['Elimination Timer']
         # Set a timer that calls _eliminate_tick every second
-        self.marked_tick_timer = ba.Timer(1.0, ba.Call(self._eliminate_tick), repeat=True)
+        self.marked_tick_timer = self.timers.timer(1.0, ba.Call(self._eliminate_tick), repeat=True)
         # Mark all chosen victims and play a sound
         for new_victim in all_victims:
+            if self.round_log:
+                self.round_log.record(RoundEvent.NEW_MARK, new_victim.log_id)
             # _marked_sounds is an array.
             # To make a nice marked sound effect, I play multiple sounds at once
             # All of them are contained in the array.
@@ -927,6 +1727,37 @@ class HotPotato(ba.TeamGameActivity[Player, ba.Team]):
                 )
             self.mark(new_victim)
 
+    # Pick who gets marked. We draw random spots from the player index and try again if we hit
+    # someone who's dead or already picked, so this costs about as much as the number of marks we want.
+    def _choose_mark_victims(self, count: int) -> list[Player]:
+        pools = [self.players_by_state[state] for state in (PlayerState.REGULAR,
+                                                            PlayerState.MARKED,
+                                                            PlayerState.STUNNED)]
+        total = sum(len(pool) for pool in pools)
+        victims: dict[Player, None] = {}
+        if total == 0:
+            return []
+
+        attempts = count * 4
+        while len(victims) < count and attempts > 0:
+            attempts -= 1
+            position = random.randrange(total)
+            for pool in pools:
+                if position < len(pool):
+                    player = pool[position]
+                    break
+                position -= len(pool)
+            if player.is_alive():
+                victims[player] = None
+
+        # If we kept hitting dead players, just pick from everyone who's left.
+        # Only players with a spaz though, we can't mark someone who's still waiting to respawn.
+        if len(victims) < count:
+            leftovers = [player for player in self.get_alive_players() if player.is_alive() and player not in victims]
+            for player in random.sample(leftovers, min(count - len(victims), len(leftovers))):
+                victims[player] = None
+        return list(victims)
+
     # This function is called when the gamemode first loads.
     @override
     def on_begin(self) -> None:
@@ -934,6 +1765,8 @@ class HotPotato(ba.TeamGameActivity[Player, ba.Team]):
 
         self.elimination_timer_display = 0
         self.match_placement = []
+        if self.round_log:
+            self.round_log.record(RoundEvent.ROUND_START, len(self.players))
 
         # End the game if there's only one player
         if len(self.players) < 2:
@@ -941,7 +1774,8 @@ class HotPotato(ba.TeamGameActivity[Player, ba.Team]):
             self._round_end_timer = ba.Timer(0.5, self.end_game)
         else:
             # Pick random player(s) to get marked
-            self.new_mark_timer = ba.Timer(2.0 if self.slow_motion else 5.2, ba.Call(self.new_mark))
+            self.new_mark_timer = self.timers.timer(EPIC_MARK_DELAY if self.slow_motion else FIRST_MARK_DELAY,
+                                                    ba.Call(self.new_mark))
 
         self._update_icons()  # Create player state icons
 
@@ -1055,6 +1889,12 @@ class HotPotato(ba.TeamGameActivity[Player, ba.Team]):
     # This is only called when the player already joined with a character.
     @override
     def player_left(self, player: Player) -> None:
+        # The leaving player is no longer part of the game, so take them out of the state index.
+        # State changes below won't put them back in.
+        self.players_by_state[player.state].discard(player)
+        if self.round_log:
+            self.round_log.record(RoundEvent.LEFT, player.log_id)
+
         # If the leaving player is marked, remove the mark
         if player.state == PlayerState.MARKED:
             self.remove_mark(player)
@@ -1064,27 +1904,29 @@ class HotPotato(ba.TeamGameActivity[Player, ba.Team]):
             player.stunned_timer = None
             player.stunned_update_timer = None
 
-        if len(self.get_marked_players()) == len(self.get_alive_players()):
+        # Counting is enough here. We only need a copy of the marked players if we're removing their marks.
+        marked = self.players_by_state[PlayerState.MARKED]
+        if len(marked) == self.alive_player_count():
             for i in self.get_marked_players():
                 self.remove_mark(i)
 
-        if len(self.get_marked_players()) == 0:
+        if len(marked) == 0:
             self.marked_tick_timer = None
             self.marked_players_died()
 
         player.set_state(PlayerState.ELIMINATED)
 
+        # We won't be spawning this player again.
+        if player.spawn_light:
+            player.spawn_light.delete()
+
     # This function is called every time a player spawns
     @override
-    def spawn_player(self, player: Player) -> ba.Actor:
-        position = self.map.get_ffa_start_position(self.players)
-        position = (position[0],
-                    position[1] - 0.3,  # Move the spawn a bit lower
-                    position[2])
+    def spawn_player(self, player: Player, position: Sequence[float] | None = None) -> ba.Actor:
+        position = self._get_spawn_position(position)
 
         name = player.getname()
 
-        light_color = ba.normalized_color(player.color)
         display_color = ba.safecolor(player.color, target_intensity=0.75)
 
         # Here we actually crate the player character
@@ -1101,17 +1943,54 @@ class HotPotato(ba.TeamGameActivity[Player, ba.Team]):
 
         # Move to the stand position and add a flash of light
         spaz.handlemessage(ba.StandMessage(position, random.uniform(0, 360)))
-        t = ba.time()
+        self._spawn_flash(player, spaz)
+        return spaz
+
+    # Pick a spot for a player to (re)spawn on, unless we've been handed one already.
+    def _get_spawn_position(self, position: Sequence[float] | None = None) -> tuple[float, float, float]:
+        if position is None:
+            position = self.map.get_ffa_start_position(self.players)
+        return (position[0],
+                position[1] - 0.3,  # Move the spawn a bit lower
+                position[2])
+
+    # Play the spawn sound and flash a light on the spawning spaz.
+    # Each player has one spawn light that we keep reusing, so respawning doesn't create (and later delete) a new one.
+    def _spawn_flash(self, player: Player, spaz: PotatoPlayerSpaz) -> None:
         self._spawn_sound.play(
             1.0,
             position=spaz.node.position,
         )
-        light = ba.newnode('light', attrs={'color': light_color})
-        spaz.node.connectattr('position', light, 'position')
-        ba.animate(light, 'intensity', {0: 0,
-                                        0.25: 1,
-                                        0.5: 0})
-        ba.timer(0.5, light.delete)
+        if not player.spawn_light:
+            player.spawn_light = ba.newnode('light', attrs={'color': ba.normalized_color(player.color),
+                                                            'intensity': 0.0})
+        spaz.node.connectattr('position', player.spawn_light, 'position')
+        ba.animate(player.spawn_light, 'intensity', {0: 0,
+                                                     0.25: 1,
+                                                     0.5: 0})
+
+    # Put a fallen spaz back on the map instead of letting it die and spawning a new one.
+    # Returns False if the spaz should die normally instead.
+    def recycle_spaz(self, spaz: PotatoPlayerSpaz) -> bool:
+        player = spaz.getplayer(Player)
+        if player is None or self.has_ended() or player.state == PlayerState.ELIMINATED:
+            return False
+
+        # We skip the death, but it should still count as one.
+        self.stats.player_was_killed(player, killed=True, killer=None)
+        if self.round_log:
+            self.round_log.record(RoundEvent.FALL, player.log_id)
+
+        # Let go of whatever we held and stand on a spawn point again.
+        spaz.node.hold_node = None
+        spaz.handlemessage(ba.StandMessage(self._get_spawn_position(), random.uniform(0, 360)))
+        self._spawn_flash(player, spaz)
+
+        # Falling while REGULAR stuns us, just like respawning would.
+        # MARKED players keep their spaz, so their mark and bomb changes are still in place.
+        if player.state in [PlayerState.REGULAR, PlayerState.STUNNED]:
+            player.set_state(PlayerState.STUNNED)
+        return True
 
     # Game reacts to various events
     @override
@@ -1124,17 +2003,30 @@ class HotPotato(ba.TeamGameActivity[Player, ba.Team]):
             # If a player gets eliminated, don't respawn
             if msg.how == 'marked_elimination':
                 return
+            if self.round_log and msg.how is ba.DeathType.FALL:
+                self.round_log.record(RoundEvent.FALL, player.log_id)
+
+            # MARKED players respawn instantly, everyone else joins the next respawn wave.
+            if player.state == PlayerState.MARKED:
+                self._respawn(player)
+            else:
+                self.respawn_waves.schedule(player)
 
-            self.spawn_player(player)  # Spawn a new player character
+    # Spawn a new player character for a player who died.
+    def _respawn(self, player: Player, position: Sequence[float] | None = None) -> None:
+        # They might have run out of time while waiting for their wave.
+        if player.state == PlayerState.ELIMINATED:
+            return
+        self.spawn_player(player, position)  # Spawn a new player character
 
-            # If a REGULAR player dies, they respawn STUNNED.
-            # If a STUNNED player dies, reapply all visual effects.
-            if player.state in [PlayerState.REGULAR, PlayerState.STUNNED]:
-                player.set_state(PlayerState.STUNNED)
+        # If a REGULAR player dies, they respawn STUNNED.
+        # If a STUNNED player dies, reapply all visual effects.
+        if player.state in [PlayerState.REGULAR, PlayerState.STUNNED]:
+            player.set_state(PlayerState.STUNNED)
 
-            # If a MARKED player falls off the map, apply the MARKED effects on the new spaz that respawns.
-            if player.state == PlayerState.MARKED:
-                self.mark(player)
+        # If a MARKED player falls off the map, apply the MARKED effects on the new spaz that respawns.
+        if player.state == PlayerState.MARKED:
+            self.mark(player)
 
     # This is called when we want to end the game and announce the winner
     @override
@@ -1153,3 +2045,27 @@ class HotPotato(ba.TeamGameActivity[Player, ba.Team]):
             # 0 is the first index, so we add 1 to the score.
             results.set_team_score(team, self.match_placement.index(team) + 1)
         self.end(results=results)  # Standard game ending behavior
+
+        # The round is over, so let's save it.
+        if self.round_log:
+            self.round_log.record(RoundEvent.ROUND_END)
+            self.round_log.close()
+
+
+# Wrap the callbacks the engine makes into Hot Potato with timers. See perf_hooks.py.
+# The watchdog relies on these too, but only profiling logs the timings at the end of the game.
+def profile_callbacks(dump: bool = True) -> None:
+    import perf_hooks
+    _load_actors()
+    perf_hooks.instrument(HotPotato,
+                          ('handlemessage', '_eliminate_tick', 'new_mark', 'spawn_player', 'player_left'),
+                          dump_after='end_game' if dump else None)
+    perf_hooks.instrument(PotatoPlayerSpaz, ('handlemessage',))
+    # Everything the engine calls into through our own timers: countdowns, elimination effects and respawn waves.
+    perf_hooks.instrument(TimerWheel, ('_advance',))
+    perf_hooks.instrument(HotPotato, ('_elimination_effects',))
+    perf_hooks.instrument(RespawnWaves, ('_release',))
+
+
+if PROFILE_CALLBACKS or WATCHDOG_BUDGET_MS:
+    profile_callbacks(dump=PROFILE_CALLBACKS)
@@ -0,0 +1,277 @@
+"""Callback timing with fixed-bucket latency histograms.
+
+Shared by the game modes in this folder. Nothing in here runs unless a
+game mode asks for it.
+
+instrument() wraps methods the engine calls into, so every call gets timed
+into a histogram for that method. dump() logs all of them, and instrument()
+can do that automatically after a given method, like end_game.
+
+watch() puts a watchdog on one activity. Any instrumented callback running
+in that activity that takes longer than the budget gets reported, with
+stacks sampled while it was running and a description of the activity's
+state.
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+import sys
+import threading
+import time
+import traceback
+import weakref
+from collections import deque
+from time import perf_counter_ns
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Iterable
+
+# Bucket 0 holds calls under 1 us, bucket i holds calls from 2^(i-1) up to 2^i us.
+# The last bucket takes everything from about half a second up.
+BUCKETS = 21
+
+
+class Histogram:
+    """Latency histogram with power-of-two microsecond buckets."""
+
+    __slots__ = ('counts', 'total_ns', 'max_ns')
+
+    def __init__(self) -> None:
+        self.clear()
+
+    def clear(self) -> None:
+        self.counts = [0] * BUCKETS
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, ns: int) -> None:
+        bucket = (ns // 1000).bit_length()
+        self.counts[bucket if bucket < BUCKETS else BUCKETS - 1] += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def percentile(self, fraction: float) -> float:
+        """Upper edge in microseconds of the bucket holding that fraction of calls."""
+        target = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= target:
+                return float(1 << bucket)
+        return 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        count = self.count
+        return {
+            'count': count,
+            'mean_us': self.total_ns / count / 1000 if count else 0.0,
+            'p50_us': self.percentile(0.5),
+            'p90_us': self.percentile(0.9),
+            'p99_us': self.percentile(0.99),
+            'max_us': self.max_ns / 1000,
+            'buckets': list(self.counts),
+        }
+
+
+# Every histogram, keyed by 'Class.method'.
+histograms: dict[str, Histogram] = {}
+
+
+def _timed(func: Callable, histogram: Histogram, name: str) -> Callable:
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        global _running
+        # Only the outermost callback gets checked by a watchdog. Anything it calls shows up in its stacks.
+        call = None
+        if _watchdogs and _running is None:
+            activity = _getactivity(doraise=False)
+            watchdog = _watchdogs.get(activity) if activity is not None else None
+            if watchdog is not None:
+                call = _running = _Call(name, watchdog)
+                _call_started.set()
+        start = perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = perf_counter_ns() - start
+            histogram.record(elapsed)
+            if call is not None:
+                _running = None
+                if elapsed > call.watchdog.budget_ns:
+                    call.watchdog.report(call, elapsed)
+
+    wrapper.__perf_hooks_wrapped__ = func  # type: ignore[attr-defined]
+    return wrapper
+
+
+def _dumping(func: Callable) -> Callable:
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        try:
+            return func(*args, **kwargs)
+        finally:
+            dump()
+
+    wrapper.__perf_hooks_wrapped__ = func  # type: ignore[attr-defined]
+    return wrapper
+
+
+def instrument(cls: type, names: Iterable[str], dump_after: str | None = None) -> None:
+    """Time every call to the named methods of cls.
+
+    If dump_after names a method, all histograms get dumped and reset after
+    every call to it. Instrumenting the same method twice does nothing.
+    """
+    for name in names:
+        func = getattr(cls, name)
+        if hasattr(func, '__perf_hooks_wrapped__'):
+            continue
+        key = f'{cls.__name__}.{name}'
+        histogram = histograms.setdefault(key, Histogram())
+        setattr(cls, name, _timed(func, histogram, key))
+    if dump_after is not None:
+        func = getattr(cls, dump_after)
+        if not hasattr(func, '__perf_hooks_wrapped__'):
+            setattr(cls, dump_after, _dumping(func))
+
+
+def snapshot() -> dict[str, dict[str, Any]]:
+    """Every histogram with at least one call, as plain dicts."""
+    return {name: histogram.as_dict() for name, histogram in histograms.items() if histogram.count}
+
+
+def format_table() -> str:
+    lines = [f'{"callback":<42}{"calls":>8}{"mean us":>10}{"p50":>8}{"p90":>8}{"p99":>8}{"max us":>10}']
+    for name, stats in sorted(snapshot().items()):
+        lines.append(f'{name:<42}{stats["count"]:>8}{stats["mean_us"]:>10.1f}{stats["p50_us"]:>8.0f}'
+                     f'{stats["p90_us"]:>8.0f}{stats["p99_us"]:>8.0f}{stats["max_us"]:>10.1f}')
+    return '\n'.join(lines)
+
+
+def reset() -> None:
+    # The wrappers hold on to their histograms, so we clear them in place.
+    for histogram in histograms.values():
+        histogram.clear()
+
+
+def dump() -> None:
+    """Log every histogram and start counting from zero again."""
+    if not any(histogram.count for histogram in histograms.values()):
+        return
+    logging.info('Callback latency:\n%s', format_table())
+    reset()
+
+
+# Watchdog: how many stacks we take from a single slow callback at most.
+MAX_SAMPLES = 5
+# How many reports each watchdog keeps around.
+MAX_REPORTS = 50
+
+
+class _Call:
+    """The outermost instrumented callback currently running on the game thread."""
+
+    __slots__ = ('name', 'watchdog', 'start_ns', 'samples')
+
+    def __init__(self, name: str, watchdog: Watchdog) -> None:
+        self.name = name
+        self.watchdog = watchdog
+        self.start_ns = perf_counter_ns()
+        self.samples: list[list[str]] = []
+
+
+class Watchdog:
+    """Reports callbacks of one activity that run longer than a budget."""
+
+    def __init__(self, budget_ms: float, describe: Callable[[], dict[str, Any]] | None = None) -> None:
+        self.budget_ns = int(budget_ms * 1_000_000)
+        # describe is usually a method of the activity we watch. Holding it strongly would keep the activity
+        # alive as long as its entry in _watchdogs, which only goes away with the activity.
+        if describe is not None and hasattr(describe, '__self__'):
+            self._describe: Callable[[], Callable[[], dict[str, Any]] | None] = weakref.WeakMethod(describe)
+        else:
+            self._describe = lambda: describe
+        self.reports: deque[dict[str, Any]] = deque(maxlen=MAX_REPORTS)
+
+    def report(self, call: _Call, elapsed_ns: int) -> None:
+        describe = self._describe()
+        try:
+            state = describe() if describe else {}
+        except Exception:  # pylint: disable=broad-except
+            # The activity might be half torn down by now. That shouldn't cost us the report.
+            state = {'error': traceback.format_exc(limit=1)}
+        report = {
+            'callback': call.name,
+            'elapsed_ms': elapsed_ns / 1_000_000,
+            'budget_ms': self.budget_ns / 1_000_000,
+            'state': state,
+            'samples': call.samples,
+        }
+        self.reports.append(report)
+        stack = ''.join(call.samples[-1]) if call.samples else '  (finished before a stack could be sampled)\n'
+        logging.warning('%s took %.2f ms (budget %.2f ms), state %s, sampled %d stack(s), last one:\n%s',
+                         call.name, report['elapsed_ms'], report['budget_ms'], state, len(call.samples), stack)
+
+
+# Activities being watched. Entries go away with their activity, as long as its Watchdog doesn't hold on to it.
+_watchdogs: weakref.WeakKeyDictionary[Any, Watchdog] = weakref.WeakKeyDictionary()
+_running: _Call | None = None
+_getactivity: Callable[..., Any] = lambda doraise=False: None
+_sampler: threading.Thread | None = None
+_game_thread_id: int | None = None
+# Set whenever a watched callback starts, so the sampler can sleep while nothing is running.
+_call_started = threading.Event()
+
+
+# Runs on its own thread. It only ever looks at _running and the call in it, never at _watchdogs,
+# which the game thread changes whenever it likes.
+def _sample() -> None:
+    while True:
+        _call_started.wait()
+        _call_started.clear()
+        call = _running
+        if call is None:
+            continue
+        budget_ns = call.watchdog.budget_ns
+        # Nothing to do unless the callback is still going once its budget is used up.
+        wait_ns = call.start_ns + budget_ns - perf_counter_ns()
+        if wait_ns > 0:
+            time.sleep(wait_ns / 1_000_000_000)
+        while _running is call and len(call.samples) < MAX_SAMPLES:
+            frame = sys._current_frames().get(_game_thread_id)  # pylint: disable=protected-access
+            # The callback might have finished while we were looking.
+            if frame is not None and _running is call:
+                call.samples.append(traceback.format_stack(frame))
+            # Holding on to the frame would keep everything in it alive, like timers that should get cancelled.
+            del frame
+            time.sleep(budget_ns / 2_000_000_000)
+        del call
+
+
+def watch(activity: Any, budget_ms: float = 4.0,
+          describe: Callable[[], dict[str, Any]] | None = None) -> Watchdog:
+    """Report instrumented callbacks of this activity that take longer than budget_ms.
+
+    describe() gets called for every slow callback and should return what
+    the activity looks like right now. Bound methods are held weakly;
+    anything else must not hold on to the activity, or it never gets
+    freed. Only methods passed to instrument() are watched.
+    """
+    global _getactivity, _sampler, _game_thread_id
+    from bascenev1 import getactivity
+
+    _getactivity = getactivity
+    _game_thread_id = threading.get_ident()
+    watchdog = _watchdogs[activity] = Watchdog(budget_ms, describe)
+    if _sampler is None:
+        _sampler = threading.Thread(target=_sample, name='PerfHooksWatchdog', daemon=True)
+        _sampler.start()
+    return watchdog
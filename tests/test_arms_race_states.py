@@ -0,0 +1,93 @@
+"""Tests for Arms Race weapon progressions and applying states to a spaz."""
+
+from __future__ import annotations
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import headless  # noqa: E402,F401  (puts the engine modules on the path)
+
+from arms_race import State, get_progression, get_states  # noqa: E402
+
+
+class FakeSpaz:
+    """Writes down everything State.apply does to it."""
+
+    def __init__(self) -> None:
+        self.calls: list[tuple] = []
+        self.bomb_type = 'normal'
+        self.curse_time = 0.0
+
+    def disconnect_controls_from_player(self) -> None:
+        self.calls.append(('disconnect',))
+
+    def connect_controls_to_player(self, **kwargs) -> None:
+        self.calls.append(('connect', kwargs))
+
+    def curse(self) -> None:
+        self.calls.append(('curse',))
+
+    def set_score_text(self, text: str) -> None:
+        self.calls.append(('score_text', text))
+
+
+def test_progression_is_cached_and_linked() -> None:
+    progression = get_progression({})
+    assert get_progression({}) is progression
+    assert [state.name for state in progression] == [state.name for state in get_states()]
+    assert [state.index for state in progression] == list(range(len(progression)))
+    assert [state.next_index for state in progression[:-1]] == list(range(1, len(progression)))
+    assert progression[-1].final and progression[-1].next_index is None
+
+    # Turning a state off makes a different progression, with the indexes closed up.
+    shorter = get_progression({'Frozen Bombs': False})
+    assert shorter is not progression
+    assert 'Frozen Bombs' not in [state.name for state in shorter]
+    assert shorter[1].name == 'Sticky Bombs' and shorter[1].index == 1
+    assert get_progression({'Frozen Bombs': False, 'Cursed': True}) is shorter
+
+
+def test_progression_is_immutable() -> None:
+    progression = get_progression({})
+    with pytest.raises(TypeError):
+        progression[0] = progression[1]  # type: ignore[index]
+    with pytest.raises(AttributeError):
+        progression[0].name = 'Something else'  # type: ignore[misc]
+
+
+def test_apply_only_touches_what_changed() -> None:
+    spaz = FakeSpaz()
+    basic = State(bomb='normal', name='Basic Bombs')
+    State.apply(basic, spaz)
+    assert spaz.calls == [('disconnect',),
+                          ('connect', {'enable_punch': False, 'enable_bomb': 'normal', 'enable_pickup': False}),
+                          ('score_text', 'Basic Bombs')]
+
+    # The same state again does nothing at all.
+    spaz.calls.clear()
+    basic.apply(spaz)
+    assert spaz.calls == []
+
+    # A different bomb keeps the same controls, so they don't get reconnected.
+    spaz.calls.clear()
+    State(bomb='ice', name='Frozen Bombs').apply(spaz)
+    assert spaz.calls == [('score_text', 'Frozen Bombs')]
+    assert spaz.bomb_type == 'ice'
+
+    # Going from bombs to punching changes the controls.
+    spaz.calls.clear()
+    State(punch=True, name='Punching only').apply(spaz)
+    assert spaz.calls == [('disconnect',),
+                          ('connect', {'enable_punch': True, 'enable_bomb': None, 'enable_pickup': False}),
+                          ('score_text', 'Punching only')]
+
+    # Getting cursed only curses us once.
+    spaz.calls.clear()
+    cursed = State(punch=True, curse=True, name='Cursed')
+    cursed.apply(spaz)
+    cursed._replace(name='Still cursed').apply(spaz)
+    assert spaz.calls.count(('curse',)) == 1
@@ -0,0 +1,72 @@
+"""Smoke tests that play whole games on the headless engine.
+
+    python -m pytest tests
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import headless  # noqa: E402
+from bascenev1._engine import engine  # noqa: E402
+
+import arms_race  # noqa: E402
+import hot_potato  # noqa: E402
+from hot_potato import PlayerState  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def no_round_logs(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Don't leave round logs behind in the headless mods directory.
+    monkeypatch.setattr(hot_potato, 'RECORD_ROUNDS', False)
+
+
+def test_hot_potato_plays_to_the_end() -> None:
+    host = headless.Host(hot_potato.HotPotato, players=8, seed=1)
+    host.begin()
+    assert host.run_until_ended()
+    states = [player.state for player in host.activity.players]
+    assert states.count(PlayerState.ELIMINATED) == 7
+
+
+def test_hot_potato_fall_in_the_same_step_as_an_elimination() -> None:
+    host = headless.Host(hot_potato.HotPotato, players=3, seed=1)
+    host.begin()
+    while not host.activity.get_marked_players():
+        host.run(0.1)
+    marked = host.activity.get_marked_players()[0]
+    fallen = next(player for player in host.activity.players if player is not marked)
+
+    # The fallen player is waiting for their respawn wave when the marked player blows up.
+    host.fall(fallen)
+    with engine.context(host.activity):
+        host.activity._eliminate_marked_players()  # pylint: disable=protected-access
+    assert marked.state == PlayerState.ELIMINATED
+    assert host.activity.alive_player_count() == 2
+
+    assert host.run_until_ended(limit=300)
+    states = [player.state for player in host.activity.players]
+    assert states.count(PlayerState.ELIMINATED) == 2
+
+
+def test_arms_race_scripted_kills() -> None:
+    host = headless.Host(arms_race.ArmsRaceGame, players=4, seed=1)
+    host.begin()
+    players = list(host.activity.players)
+    killer = players[0]
+    for _ in range(100):
+        victim = next((player for player in players[1:] if player.is_alive()), None)
+        if victim is not None and killer.is_alive():
+            host.bomb_hit(killer, victim, magnitude=50000)
+        host.run(0.5)
+        if host.activity.has_ended():
+            break
+    assert host.activity.has_ended()
+    assert killer.state.final
+    assert killer.team.score == 1
+    assert all(player.state.index == 0 for player in players[1:])
@@ -0,0 +1,98 @@
+"""Tests for the building blocks Hot Potato keeps its state in."""
+
+from __future__ import annotations
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import headless  # noqa: E402,F401  (puts the engine modules on the path)
+from bascenev1._engine import engine  # noqa: E402
+
+from hot_potato import PlayerIndex, TimerWheel  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def fresh_engine() -> None:
+    engine.reset()
+
+
+def test_timer_wheel_never_fires_early() -> None:
+    wheel = TimerWheel()
+    fired: dict[str, float] = {}
+    # Gets the wheel's engine timer going at 0.0.
+    first = wheel.timer(1.0, lambda: fired.setdefault('first', engine.time))
+    # Partway through a tick, so the wheel's next tick comes sooner than a full tick from now.
+    engine.run_until(0.05)
+    second = wheel.timer(0.3, lambda: fired.setdefault('second', engine.time))
+    engine.run_until(2.0)
+    assert fired['first'] == pytest.approx(1.0)
+    assert 0.35 - 1e-9 <= fired['second'] <= 0.45 + 1e-9
+    del first, second
+
+
+def test_timer_wheel_isolates_errors(capsys: pytest.CaptureFixture[str]) -> None:
+    wheel = TimerWheel()
+    calls = []
+
+    def broken() -> None:
+        calls.append('broken')
+        raise RuntimeError('boom')
+
+    timers = [wheel.timer(0.5, broken), wheel.timer(0.5, lambda: calls.append('fine')),
+              wheel.timer(0.2, lambda: calls.append('ticking'), repeat=True)]
+    engine.run_until(1.0)
+    # The failing countdown doesn't take the others in its tick, or later ticks, down with it.
+    assert calls.count('broken') == 1
+    assert calls.count('fine') == 1
+    assert calls.count('ticking') == 5
+    assert 'boom' in capsys.readouterr().err
+    del timers
+
+
+def test_timer_wheel_cancels_dropped_timers() -> None:
+    wheel = TimerWheel()
+    calls = []
+    kept = wheel.timer(0.3, lambda: calls.append('kept'))
+    wheel.timer(0.3, lambda: calls.append('dropped'))
+    engine.run_until(1.0)
+    assert calls == ['kept']
+    del kept
+
+
+class FakePlayer:
+    """Compared by identity, like real players."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __repr__(self) -> str:
+        return self.name
+
+
+def test_player_index_swap_remove() -> None:
+    a, b, c, d = (FakePlayer(name) for name in 'abcd')
+    index = PlayerIndex()
+    for player in (a, b, c, d):
+        index.add(player)
+    index.add(a)
+    assert len(index) == 4
+
+    # The last player moves into the hole.
+    index.discard(b)
+    assert [index[i] for i in range(len(index))] == [a, d, c]
+    assert b not in index and d in index
+
+    # Removing the last one, or one that isn't there, leaves everyone else where they are.
+    index.discard(c)
+    index.discard(FakePlayer('x'))
+    assert list(index) == [a, d]
+
+    # Positions stay right after a swap, so later removals still find the right slot.
+    index.discard(a)
+    assert list(index) == [d]
+    index.discard(d)
+    assert len(index) == 0
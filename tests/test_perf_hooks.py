@@ -0,0 +1,36 @@
+"""Tests for the profiling and watchdog helpers."""
+
+from __future__ import annotations
+
+import gc
+import os
+import sys
+import weakref
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import headless  # noqa: E402
+from bascenev1._engine import engine  # noqa: E402
+
+import hot_potato  # noqa: E402
+import perf_hooks  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def no_round_logs(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(hot_potato, 'RECORD_ROUNDS', False)
+
+
+def test_watched_activity_is_freed() -> None:
+    host = headless.Host(hot_potato.HotPotato, players=4, seed=1)
+    host.begin()
+    perf_hooks.watch(host.activity, 4.0, host.activity.describe_state)
+    assert host.run_until_ended()
+    activity = weakref.ref(host.activity)
+    engine.reset()
+    del host
+    gc.collect()
+    assert activity() is None
+    assert not perf_hooks._watchdogs  # pylint: disable=protected-access
@@ -0,0 +1,59 @@
+"""Tests for spawning players back in waves."""
+
+from __future__ import annotations
+
+import gc
+import os
+import sys
+import weakref
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import headless  # noqa: E402
+from bascenev1._engine import engine  # noqa: E402
+
+import arms_race  # noqa: E402
+
+
+def _kill_staggered(host: headless.Host, gap: float) -> list[float]:
+    players = list(host.activity.players)
+    died = []
+    for victim in players[1:]:
+        host.bomb_hit(players[0], victim, magnitude=50000)
+        died.append(host.time)
+        host.run(gap)
+    return died
+
+
+def test_staggered_deaths_share_a_wave() -> None:
+    host = headless.Host(arms_race.ArmsRaceGame, players=6, seed=1)
+    host.begin()
+    host.run(1.0)
+    died = _kill_staggered(host, 0.05)
+    waves = host.activity.respawn_waves._waves  # pylint: disable=protected-access
+    # Five deaths within 0.2 seconds land in at most two windows.
+    assert sum(len(wave.players) for wave in waves.values()) == 5
+    assert len(waves) <= 2
+
+    # Players on a team of their own respawn after 3 seconds, never before, and at most a window later.
+    victims = list(host.activity.players)[1:]
+    window = host.activity.respawn_waves.window
+    host.run_until(died[0] + 3.0 - 0.01)
+    assert not victims[0].is_alive()
+    host.run_until(died[-1] + 3.0 + window)
+    assert all(victim.is_alive() for victim in victims)
+
+
+def test_activity_is_freed_without_the_cycle_collector() -> None:
+    host = headless.Host(arms_race.ArmsRaceGame, players=4, seed=1)
+    host.begin()
+    host.run(1.0)
+    _kill_staggered(host, 0.05)
+    activity = weakref.ref(host.activity)
+    gc.disable()
+    try:
+        engine.reset()
+        del host
+        assert activity() is None
+    finally:
+        gc.enable()
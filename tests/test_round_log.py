@@ -0,0 +1,63 @@
+"""Tests for recording Hot Potato rounds and reading them back."""
+
+from __future__ import annotations
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import headless  # noqa: E402,F401  (puts the engine modules on the path)
+import babase  # noqa: E402
+from bascenev1._engine import engine  # noqa: E402
+
+import hot_potato  # noqa: E402
+from hot_potato import PlayerState, RoundEvent, RoundLogger  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def log_directory(tmp_path, monkeypatch: pytest.MonkeyPatch) -> str:
+    engine.reset()
+    monkeypatch.setattr(babase.app.env, 'python_directory_user', str(tmp_path))
+    return os.path.join(str(tmp_path), hot_potato.ROUND_LOG_DIRECTORY)
+
+
+def test_round_trip(log_directory: str) -> None:
+    # A tiny capacity, so the round spills over into a few full buffers.
+    logger = RoundLogger({'Elimination Timer': 15}, capacity=4)
+    alice = logger.add_player('Alice')
+    bob = logger.add_player('Bob')
+    logger.record(RoundEvent.ROUND_START, 2)
+    for step in range(5):
+        engine.run_until(step + 1.0)
+        logger.record(RoundEvent.PASS, alice, bob)
+        logger.record(RoundEvent.STATE, bob, state=PlayerState.MARKED)
+    logger.record(RoundEvent.ELIMINATED, bob)
+    logger.record(RoundEvent.ROUND_END)
+    recorded = logger.events()
+    logger.close()
+    hot_potato.round_log_writer.flush(5.0)
+
+    (name,) = os.listdir(log_directory)
+    log = hot_potato.read_round_log(os.path.join(log_directory, name))
+    assert log.players == ['Alice', 'Bob']
+    assert log.settings == {'Elimination Timer': 15}
+    assert log.events == recorded
+    assert len(log.events) == 13
+    assert log.events[0] == (0.0, RoundEvent.ROUND_START, None, 2, -1)
+    assert log.events[2] == (1.0, RoundEvent.STATE, PlayerState.MARKED, bob, -1)
+    assert log.events[-1] == (5.0, RoundEvent.ROUND_END, None, -1, -1)
+
+
+def test_recording_stops_after_the_last_buffer(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(hot_potato, 'ROUND_LOG_MAX_BUFFERS', 2)
+    logger = RoundLogger({}, capacity=4)
+    for _ in range(20):
+        logger.record(RoundEvent.FALL, 0)
+    assert logger.truncated
+    # Two full buffers set aside plus the one we were filling, and nothing after that.
+    assert len(logger.events()) == 12
+    # Whatever did get recorded starts at the beginning of the round.
+    assert all(event[1] is RoundEvent.FALL for event in logger.events())
@@ -0,0 +1,256 @@
+"""Monte Carlo balance simulator for Hot Potato settings.
+
+Plays thousands of abstract Hot Potato matches for every combination of
+fall penalties, elimination timer and marked knockback scale, spread over
+a process pool. Matches follow the game's own rules: stun times come from
+hot_potato.stun_time_for_falls, passes are checked with
+hot_potato.can_pass_mark, mark counts come from hot_potato.mark_count, and
+the mark and end-of-game delays are the game's constants.
+
+What players do is modelled rather than simulated. Every player has a
+skill rolled per match. Falls happen at a rate that goes down with skill.
+Marked players land passes at a rate that goes up with skill and with
+less knockback (MARKED_KNOCKBACK_SCALE), since marked players who get
+pushed around less catch people sooner.
+
+Every batch of matches gets its own seed derived from --seed, the
+parameter set and the batch number, so results don't depend on how many
+workers run them.
+
+Without leaves, every mark lasts exactly the elimination timer and takes
+out a fixed number of players, so match length only depends on the
+lobby size and the timer. Penalties and knockback show up in who wins.
+
+    python tools/balance_sim.py
+    python tools/balance_sim.py --players 16 --timers 10,15 --knockback 0.6,0.8,1.0
+    python tools/balance_sim.py --penalties "1.5,2.5,3.5,5,6,7,8,9,10;1,2,3" --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import statistics
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, NamedTuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import headless  # noqa: E402,F401  (puts the engine modules on the path)
+import hot_potato  # noqa: E402
+from hot_potato import PlayerState  # noqa: E402
+
+if TYPE_CHECKING:
+    from typing import Any, Sequence
+
+# The game ticks stuns every 0.1 s, so the simulation does too.
+TICK = 1.0 / hot_potato.STUN_TICKS_PER_SECOND
+# Player skill is rolled uniformly between these.
+SKILL_RANGE = (0.5, 1.5)
+# Falls per second for a player of skill 1.0 who isn't stunned.
+FALL_RATE = 0.03
+# Passes per second landed by a marked player of skill 1.0 at full knockback.
+PASS_RATE = 0.25
+# Matches handed to a worker at a time.
+BATCH = 50
+# Give up on matches that run longer than this many simulated seconds.
+MATCH_LIMIT = 3600.0
+
+
+# Whole ticks in this many seconds, rounding up. Time is counted in ticks so it doesn't drift the way
+# adding up TICK does, which would start marks a tick late.
+def _ticks(seconds: float) -> int:
+    return math.ceil(round(seconds / TICK, 6))
+
+
+class Params(NamedTuple):
+    penalties: tuple[float, ...]
+    elimination_timer: int
+    knockback: float
+
+
+class MatchResult(NamedTuple):
+    length: float
+    marks: int
+    # Player skills in finishing order, winner first.
+    placement: list[float]
+
+
+def play_match(params: Params, players: int, rng: random.Random) -> MatchResult:
+    """Play one abstract match to the end."""
+    skill = [rng.uniform(*SKILL_RANGE) for _ in range(players)]
+    state = [PlayerState.REGULAR] * players
+    fall_times = [0] * players
+    stun_ticks = [0] * players
+    eliminated: list[int] = []
+
+    fall_chance = [FALL_RATE * TICK / s for s in skill]
+    pass_chance = [PASS_RATE * TICK * s / params.knockback for s in skill]
+    mark_ticks = round(1.0 / TICK)
+
+    tick = 0
+    limit = _ticks(MATCH_LIMIT)
+    length = 0.0
+    next_mark = _ticks(hot_potato.FIRST_MARK_DELAY)
+    countdown = 0
+    countdown_ticks = 0
+    marks = 0
+
+    while tick < limit:
+        tick += 1
+        alive = [i for i in range(players) if state[i] is not PlayerState.ELIMINATED]
+
+        # Start a new mark once the delay is up.
+        if next_mark is not None and tick >= next_mark:
+            next_mark = None
+            for victim in rng.sample(alive, hot_potato.mark_count(len(alive))):
+                state[victim] = PlayerState.MARKED
+                stun_ticks[victim] = 0
+            countdown = params.elimination_timer
+            countdown_ticks = 0
+            marks += 1
+
+        for i in alive:
+            # Stuns wear off, same as Player.stun_remove.
+            if state[i] is PlayerState.STUNNED:
+                stun_ticks[i] -= 1
+                if stun_ticks[i] <= 0:
+                    state[i] = PlayerState.REGULAR
+                continue
+
+            # Falling while REGULAR stuns us. Marked players respawn still marked.
+            if rng.random() < fall_chance[i]:
+                if state[i] is PlayerState.REGULAR:
+                    state[i] = PlayerState.STUNNED
+                    stun_ticks[i] = _ticks(hot_potato.stun_time_for_falls(fall_times[i], params.penalties) + TICK)
+                    fall_times[i] += 1
+                continue
+
+            if state[i] is PlayerState.MARKED and rng.random() < pass_chance[i]:
+                target = alive[rng.randrange(len(alive))]
+                if target != i and hot_potato.can_pass_mark(state[i], state[target]):
+                    state[target] = PlayerState.MARKED
+                    stun_ticks[target] = 0
+                    state[i] = PlayerState.REGULAR
+
+        # The elimination countdown, same as HotPotato._eliminate_tick.
+        if countdown:
+            countdown_ticks += 1
+            if countdown_ticks == mark_ticks:
+                countdown_ticks = 0
+                countdown -= 1
+                if countdown == 0:
+                    for i in alive:
+                        if state[i] is PlayerState.MARKED:
+                            state[i] = PlayerState.ELIMINATED
+                            eliminated.append(i)
+                    alive = [i for i in alive if state[i] is not PlayerState.ELIMINATED]
+                    if len(alive) < 2:
+                        eliminated.extend(alive)
+                        length = hot_potato.END_GAME_DELAY
+                        break
+                    next_mark = tick + _ticks(hot_potato.NEXT_MARK_DELAY)
+
+    length += tick * TICK
+    return MatchResult(length, marks, [skill[i] for i in reversed(eliminated)])
+
+
+def _batch_seed(seed: int, param_index: int, batch: int) -> str:
+    # String seeds are hashed the same way in every process and on every run.
+    return f'{seed}-{param_index}-{batch}'
+
+
+def run_batch(params: Params, players: int, matches: int, seed: str) -> list[MatchResult]:
+    rng = random.Random(seed)
+    return [play_match(params, players, rng) for _ in range(matches)]
+
+
+def _percentile(values: Sequence[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(params: Params, results: list[MatchResult]) -> dict[str, Any]:
+    lengths = [result.length for result in results]
+    players = len(results[0].placement)
+    # How often each skill quartile finishes in each quarter of the standings.
+    quartiles = [[0] * 4 for _ in range(4)]
+    low, high = SKILL_RANGE
+    for result in results:
+        for place, skill in enumerate(result.placement):
+            quartile = min(3, int((skill - low) / (high - low) * 4))
+            quartiles[quartile][min(3, place * 4 // players)] += 1
+    return {
+        'penalties': list(params.penalties),
+        'elimination_timer': params.elimination_timer,
+        'knockback': params.knockback,
+        'matches': len(results),
+        'length_mean': round(statistics.fmean(lengths), 2),
+        'length_p50': round(_percentile(lengths, 0.5), 2),
+        'length_p90': round(_percentile(lengths, 0.9), 2),
+        'length_max': round(max(lengths), 2),
+        'marks_mean': round(statistics.fmean(result.marks for result in results), 2),
+        'win_share_by_skill_quartile': [round(row[0] / max(1, sum(row)) * 4, 3) for row in quartiles],
+        'placement_by_skill_quartile': quartiles,
+    }
+
+
+def _parse_list(text: str, kind: type) -> list:
+    return [kind(part) for part in text.split(',') if part.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--players', type=int, default=8)
+    parser.add_argument('--matches', type=int, default=2000, help='matches per parameter set')
+    parser.add_argument('--penalties', default=','.join(str(p) for p in hot_potato.FALL_PENALTIES),
+                        help='fall penalty lists to try, separated by ";"')
+    parser.add_argument('--timers', default='10,15,20', help='elimination timers to try')
+    parser.add_argument('--knockback', default=str(hot_potato.MARKED_KNOCKBACK_SCALE),
+                        help='marked knockback scales to try')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    grid = [Params(tuple(penalties), timer, knockback)
+            for penalties, timer, knockback in itertools.product(
+                [_parse_list(part, float) for part in args.penalties.split(';')],
+                _parse_list(args.timers, int),
+                _parse_list(args.knockback, float))]
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = []
+        for index, params in enumerate(grid):
+            batches = []
+            for batch, start in enumerate(range(0, args.matches, BATCH)):
+                batches.append(pool.submit(run_batch, params, args.players,
+                                           min(BATCH, args.matches - start),
+                                           _batch_seed(args.seed, index, batch)))
+            futures.append(batches)
+        summaries = [summarize(params, [result for batch in batches for result in batch.result()])
+                     for params, batches in zip(grid, futures)]
+
+    if args.json:
+        json.dump(summaries, sys.stdout, indent=2)
+        print()
+        return
+    print(f'{"penalties":<28}{"timer":>6}{"knock":>7}{"mean s":>9}{"p50 s":>8}{"p90 s":>8}'
+          f'{"max s":>8}{"marks":>7}  win share by skill quartile (1.0 = fair)')
+    for summary in summaries:
+        penalties = ','.join(f'{p:g}' for p in summary['penalties'])
+        if len(penalties) > 26:
+            penalties = penalties[:23] + '...'
+        print(f'{penalties:<28}{summary["elimination_timer"]:>6}{summary["knockback"]:>7.2f}'
+              f'{summary["length_mean"]:>9.1f}{summary["length_p50"]:>8.1f}{summary["length_p90"]:>8.1f}'
+              f'{summary["length_max"]:>8.1f}{summary["marks_mean"]:>7.1f}  '
+              + ' '.join(f'{share:.2f}' for share in summary['win_share_by_skill_quartile']))
+
+
+if __name__ == '__main__':
+    main()
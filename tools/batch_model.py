@@ -0,0 +1,240 @@
+"""Vectorized batch model of Hot Potato matches.
+
+Runs the same abstract matches as tools/balance_sim.py, but keeps every
+game in the batch as rows of NumPy arrays (state, fall count, stun ticks
+left, elimination countdown) and advances them all together, one tick at
+a time. Stun times are looked up from an array built with
+hot_potato.stun_time_for_falls, passes are checked against a table built
+from hot_potato.can_pass_mark, and mark counts come from
+hot_potato.mark_count.
+
+A few things differ from the object model:
+
+- Passes within one tick are resolved against the states at the start of
+  that tick.
+- A player can only receive one pass per tick.
+- Players eliminated together are ranked by seat.
+
+None of this shows up in the summaries at the sizes we sweep.
+
+    python tools/batch_model.py
+    python tools/batch_model.py --games 100000 --players 16 --timers 10,15,20
+    python tools/batch_model.py --compare 200
+
+Needs NumPy, which the game itself doesn't use.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import sys
+import time
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import balance_sim  # noqa: E402
+from balance_sim import FALL_RATE, PASS_RATE, SKILL_RANGE, TICK, MatchResult, Params  # noqa: E402
+import hot_potato  # noqa: E402
+from hot_potato import PlayerState  # noqa: E402
+
+if TYPE_CHECKING:
+    from typing import Any
+
+REGULAR = PlayerState.REGULAR.value
+MARKED = PlayerState.MARKED.value
+ELIMINATED = PlayerState.ELIMINATED.value
+STUNNED = PlayerState.STUNNED.value
+
+# can_pass_mark for every pair of states, indexed by [marked player's state, hit player's state].
+PASS_TABLE = np.array([[hot_potato.can_pass_mark(marked, hit) for hit in PlayerState] for marked in PlayerState])
+TICKS_PER_SECOND = hot_potato.STUN_TICKS_PER_SECOND
+
+
+def _ticks(seconds: float) -> int:
+    return math.ceil(round(seconds / TICK, 6))
+
+
+def stun_table(penalties: tuple[float, ...]) -> np.ndarray:
+    """Stun ticks for every fall count, capped at the last penalty like the game does."""
+    return np.array([_ticks(hot_potato.stun_time_for_falls(falls, penalties) + TICK)
+                     for falls in range(len(penalties))], dtype=np.int32)
+
+
+def run_batch(params: Params, games: int, players: int, seed: int) -> tuple[list[MatchResult], int]:
+    """Play a batch of matches. Also returns how many player-ticks were simulated."""
+    rng = np.random.default_rng(seed)
+    rows = np.arange(games)
+    stuns = stun_table(params.penalties)
+    last_penalty = len(stuns) - 1
+
+    skill = rng.uniform(*SKILL_RANGE, size=(games, players))
+    fall_chance = FALL_RATE * TICK / skill
+    pass_chance = PASS_RATE * TICK * skill / params.knockback
+
+    state = np.full((games, players), REGULAR, dtype=np.int8)
+    falls = np.zeros((games, players), dtype=np.int16)
+    stun_left = np.zeros((games, players), dtype=np.int32)
+    # When each player got eliminated, in elimination order. Survivors get the highest number.
+    out_order = np.zeros((games, players), dtype=np.int32)
+
+    next_mark = np.full(games, _ticks(hot_potato.FIRST_MARK_DELAY), dtype=np.int32)
+    countdown = np.zeros(games, dtype=np.int32)
+    countdown_ticks = np.zeros(games, dtype=np.int32)
+    marks = np.zeros(games, dtype=np.int32)
+    eliminations = np.zeros(games, dtype=np.int32)
+    length = np.zeros(games)
+    running = np.ones(games, dtype=bool)
+    mark_ticks = TICKS_PER_SECOND
+    next_mark_delay = _ticks(hot_potato.NEXT_MARK_DELAY)
+    limit = _ticks(balance_sim.MATCH_LIMIT)
+    mark_counts = np.array([hot_potato.mark_count(alive) for alive in range(players + 1)])
+
+    player_ticks = 0
+    tick = 0
+    while running.any() and tick < limit:
+        tick += 1
+        active = running[:, None] & (state != ELIMINATED)
+        player_ticks += int(running.sum()) * players
+
+        # Start new marks. Victims are the players with the lowest random keys.
+        starting = running & (next_mark == tick)
+        if starting.any():
+            keys = rng.random((games, players))
+            keys[~active] = np.inf
+            ranks = keys.argsort(axis=1).argsort(axis=1)
+            count = mark_counts[active.sum(axis=1)]
+            victims = starting[:, None] & (ranks < count[:, None])
+            state[victims] = MARKED
+            stun_left[victims] = 0
+            countdown[starting] = params.elimination_timer
+            countdown_ticks[starting] = 0
+            next_mark[starting] = -1
+            marks += starting
+
+        # Stuns wear off.
+        stunned = active & (state == STUNNED)
+        stun_left[stunned] -= 1
+        state[stunned & (stun_left <= 0)] = REGULAR
+
+        # Everyone else might fall. Falling REGULAR players get stunned, marked ones stay marked.
+        free = active & ~stunned
+        fell = free & (rng.random((games, players)) < fall_chance)
+        newly_stunned = fell & (state == REGULAR)
+        state[newly_stunned] = STUNNED
+        stun_left[newly_stunned] = stuns[np.minimum(falls[newly_stunned], last_penalty)]
+        falls[newly_stunned] += 1
+
+        # Marked players who didn't fall try to pass the mark to a random alive player.
+        trying = free & ~fell & (state == MARKED) & (rng.random((games, players)) < pass_chance)
+        if trying.any():
+            game, passer = np.nonzero(trying)
+            alive_count = active.sum(axis=1)[game]
+            pick = (rng.random(len(game)) * alive_count).astype(np.int32)
+            target = (active[game].cumsum(axis=1) > pick[:, None]).argmax(axis=1)
+            ok = (target != passer) & PASS_TABLE[state[game, passer], state[game, target]]
+            game, passer, target = game[ok], passer[ok], target[ok]
+            # Only the first pass to each player in a game goes through this tick.
+            _, first = np.unique(game * players + target, return_index=True)
+            game, passer, target = game[first], passer[first], target[first]
+            state[game, target] = MARKED
+            stun_left[game, target] = 0
+            state[game, passer] = REGULAR
+
+        # Elimination countdowns.
+        counting = running & (countdown > 0)
+        countdown_ticks[counting] += 1
+        second = counting & (countdown_ticks == mark_ticks)
+        countdown_ticks[second] = 0
+        countdown[second] -= 1
+        boom = second & (countdown == 0)
+        if boom.any():
+            eliminations += boom
+            going = boom[:, None] & (state == MARKED)
+            state[going] = ELIMINATED
+            out_order[going] = eliminations[np.nonzero(going)[0]]
+            alive_count = (state != ELIMINATED).sum(axis=1)
+            over = boom & (alive_count < 2)
+            survivors = over[:, None] & (state != ELIMINATED)
+            out_order[survivors] = eliminations[np.nonzero(survivors)[0]] + 1
+            length[over] = tick * TICK + hot_potato.END_GAME_DELAY
+            running &= ~over
+            next_mark[boom & ~over] = tick + next_mark_delay
+
+    length[running] = tick * TICK
+    # Winner first: latest to go out, ties broken by seat like the object model does.
+    order = np.argsort(-(out_order.astype(np.int64) * players + np.arange(players)), axis=1)
+    placements = np.take_along_axis(skill, order, axis=1)
+    results = [MatchResult(float(length[g]), int(marks[g]), placements[g].tolist()) for g in rows]
+    return results, player_ticks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--players', type=int, default=8)
+    parser.add_argument('--games', type=int, default=20000, help='games per parameter set')
+    parser.add_argument('--penalties', default=','.join(str(p) for p in hot_potato.FALL_PENALTIES),
+                        help='fall penalty lists to try, separated by ";"')
+    parser.add_argument('--timers', default='10,15,20', help='elimination timers to try')
+    parser.add_argument('--knockback', default=str(hot_potato.MARKED_KNOCKBACK_SCALE),
+                        help='marked knockback scales to try')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--compare', type=int, default=0, metavar='MATCHES',
+                        help='also time this many matches through balance_sim for comparison')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    grid = [Params(tuple(penalties), timer, knockback)
+            for penalties, timer, knockback in itertools.product(
+                [[float(p) for p in part.split(',')] for part in args.penalties.split(';')],
+                [int(t) for t in args.timers.split(',')],
+                [float(k) for k in args.knockback.split(',')])]
+
+    summaries = []
+    for index, params in enumerate(grid):
+        start = time.perf_counter()
+        results, player_ticks = run_batch(params, args.games, args.players, args.seed * 1000 + index)
+        wall = time.perf_counter() - start
+        summary = balance_sim.summarize(params, results)
+        summary['wall_s'] = round(wall, 3)
+        summary['player_ticks_per_s'] = round(player_ticks / wall)
+        summaries.append(summary)
+
+    comparison: dict[str, Any] | None = None
+    if args.compare:
+        rng = random.Random(args.seed)
+        start = time.perf_counter()
+        matches = [balance_sim.play_match(grid[0], args.players, rng) for _ in range(args.compare)]
+        wall = time.perf_counter() - start
+        player_ticks = sum(round(match.length / TICK) for match in matches) * args.players
+        comparison = {'matches': args.compare, 'wall_s': round(wall, 3),
+                      'player_ticks_per_s': round(player_ticks / wall)}
+
+    if args.json:
+        json.dump({'batch': summaries, 'object_model': comparison}, sys.stdout, indent=2)
+        print()
+        return
+    print(f'{"penalties":<28}{"timer":>6}{"knock":>7}{"mean s":>9}{"p90 s":>8}{"marks":>7}'
+          f'{"wall s":>8}{"player-ticks/s":>16}  win share by skill quartile')
+    for summary in summaries:
+        penalties = ','.join(f'{p:g}' for p in summary['penalties'])
+        if len(penalties) > 26:
+            penalties = penalties[:23] + '...'
+        print(f'{penalties:<28}{summary["elimination_timer"]:>6}{summary["knockback"]:>7.2f}'
+              f'{summary["length_mean"]:>9.1f}{summary["length_p90"]:>8.1f}{summary["marks_mean"]:>7.1f}'
+              f'{summary["wall_s"]:>8.2f}{summary["player_ticks_per_s"]:>16,}  '
+              + ' '.join(f'{share:.2f}' for share in summary['win_share_by_skill_quartile']))
+    if comparison:
+        print(f'object model (balance_sim): {comparison["matches"]} matches in {comparison["wall_s"]} s, '
+              f'{comparison["player_ticks_per_s"]:,} player-ticks/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+"""Replays a recorded Hot Potato round on the headless engine.
+
+Loads a round log written by hot_potato.RoundLogger and plays it back on
+the virtual clock, as fast as the CPU allows. Recorded passes are
+delivered as punches from the marked player, falls as out-of-bounds
+messages and leaves through the normal leave path. New marks go to the
+recorded victims, while eliminations and state changes are left for the
+game to produce, so any difference from the recording gets reported.
+
+    python tools/replay_round.py round.hprl
+    python tools/replay_round.py round.hprl --repeat 20 --json
+
+Running any headless game writes logs to replay into
+<python_directory_user>/hot_potato_logs/.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from typing import TYPE_CHECKING
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import headless  # noqa: E402
+from bascenev1._engine import engine  # noqa: E402
+
+import hot_potato  # noqa: E402
+from hot_potato import PlayerState, RoundEvent  # noqa: E402
+
+if TYPE_CHECKING:
+    from typing import Any
+
+# Events the driver has to cause. Everything else is something the game does on its own.
+DRIVEN_EVENTS = (RoundEvent.PASS, RoundEvent.FALL, RoundEvent.LEFT)
+# Events compared against the recording once the replay is done.
+CHECKED_EVENTS = (RoundEvent.NEW_MARK, RoundEvent.PASS, RoundEvent.ELIMINATED,
+                  RoundEvent.LEFT, RoundEvent.FALL)
+
+
+class UnsavedRoundLogger(hot_potato.RoundLogger):
+    """RoundLogger that keeps its events in memory only."""
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class ReplayHotPotato(hot_potato.HotPotato):
+    """HotPotato that marks the victims from a recording."""
+
+    recorded_marks: deque[list[int]] = deque()
+
+    def __init__(self, settings: dict):
+        super().__init__(settings)
+        # The replay gets recorded like any other round, so we can compare it to the original afterwards.
+        self.round_log = UnsavedRoundLogger(settings)
+
+    def _choose_mark_victims(self, count: int) -> list[hot_potato.Player]:
+        if not self.recorded_marks:
+            return super()._choose_mark_victims(count)
+        by_id = {player.log_id: player for player in self.players}
+        return [by_id[log_id] for log_id in self.recorded_marks.popleft() if log_id in by_id]
+
+
+def _recorded_marks(log: hot_potato.RoundLog) -> deque[list[int]]:
+    marks: deque[list[int]] = deque()
+    last_time = None
+    for when, event, _state, player, _other in log.events:
+        if event is not RoundEvent.NEW_MARK:
+            continue
+        if when != last_time:
+            marks.append([])
+            last_time = when
+        marks[-1].append(player)
+    return marks
+
+
+def _summary(events: list[tuple]) -> list[tuple[str, int, int]]:
+    return [(event.name, player, other) for _when, event, _state, player, other in events
+            if event in CHECKED_EVENTS]
+
+
+def replay(log: hot_potato.RoundLog) -> dict[str, Any]:
+    """Play a round log back once and measure it."""
+    ReplayHotPotato.recorded_marks = _recorded_marks(log)
+    host = headless.Host(ReplayHotPotato, settings=log.settings, players=0)
+    players = [host.add_player(name) for name in log.players]
+    activity = host.activity
+    replay_log = activity.round_log
+
+    peak_nodes = peak_timers = 0
+    skipped = 0
+
+    def sample() -> None:
+        nonlocal peak_nodes, peak_timers
+        peak_nodes = max(peak_nodes, len(engine.nodes))
+        peak_timers = max(peak_timers, engine.live_timers())
+
+    start = time.perf_counter()
+    host.begin()
+    # The recording's clock started wherever the real activity was when the round began.
+    offset = host.time - log.events[0][0] if log.events else 0.0
+
+    for when, event, _state, player, other in log.events:
+        if event not in DRIVEN_EVENTS:
+            continue
+        # Walk up to the event one simulated second at a time, so we catch the busiest moments.
+        target = when + offset
+        while host.time + 1.0 < target and not activity.has_ended():
+            host.run(1.0)
+            sample()
+        host.run_until(target)
+        if activity.has_ended():
+            break
+
+        subject = players[player]
+        if event is RoundEvent.PASS:
+            attacker = subject
+            victim = players[other]
+            if (attacker.state is PlayerState.MARKED and attacker.is_alive()
+                    and victim.is_alive()):
+                host.punch(attacker, victim)
+            else:
+                skipped += 1
+        elif event is RoundEvent.FALL:
+            if subject.is_alive():
+                host.fall(subject)
+            else:
+                skipped += 1
+        elif event is RoundEvent.LEFT:
+            if subject in activity.players:
+                host.remove_player(subject)
+            else:
+                skipped += 1
+        sample()
+
+    while not activity.has_ended() and engine.next_due() is not None:
+        host.run(1.0)
+        sample()
+    wall = time.perf_counter() - start
+
+    recorded = _summary(log.events)
+    replayed = _summary(replay_log.events())
+    matching = 0
+    for expected, got in zip(recorded, replayed):
+        if expected != got:
+            break
+        matching += 1
+
+    stats = host.snapshot()
+    simulated = host.time
+    return {
+        'players': len(players),
+        'simulated_s': round(simulated, 3),
+        'wall_s': round(wall, 6),
+        'speedup': round(simulated / wall, 1) if wall else None,
+        'callbacks_per_sim_s': round(stats['timer_calls'] / simulated, 1) if simulated else 0.0,
+        'peak_nodes': peak_nodes,
+        'peak_timers': peak_timers,
+        'final_nodes': stats['live_nodes'],
+        'final_timers': stats['live_timers'],
+        'ended': activity.has_ended(),
+        'events_recorded': len(recorded),
+        'events_matching': matching,
+        'events_replayed': len(replayed),
+        'skipped': skipped,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('log', help='round log to replay')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='replay this many times and report the fastest')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    log = hot_potato.read_round_log(args.log)
+    runs = [replay(log) for _ in range(max(1, args.repeat))]
+    result = min(runs, key=lambda run: run['wall_s'])
+
+    if args.json:
+        json.dump(result, sys.stdout, indent=2)
+        print()
+        return
+    for key, value in result.items():
+        print(f'{key:<22}{value}')
+
+
+if __name__ == '__main__':
+    main()